@@ -1,44 +1,149 @@
+import boto3  # type: ignore
 import json
 import urllib.request
 import urllib.error
 import logging
 import random
 from datetime import datetime
+from functools import partial
+
+from cloud_gallery.artwork import API_FIELDS, Artwork
+from cloud_gallery.batch_get import batch_get_artworks
+from cloud_gallery.circuit_breaker import (
+    DEFAULT_FAILURE_THRESHOLD,
+    CircuitBreaker,
+    CircuitOpenError,
+    S3StateStore,
+)
+
+from reserve import ArtworkReserve
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Initialize AWS clients
+s3_client = boto3.client("s3")
+dynamodb = boto3.resource("dynamodb")
+
+DEFAULT_API_BASE_URL = "https://api.artic.edu/api/v1"
+DEFAULT_ARTWORK_COUNT = 9
+# Maximum page size accepted by the Art Institute API
+API_MAX_LIMIT = 100
+DEFAULT_API_TIMEOUT = 5
+
+CIRCUIT_STATE_KEY = "circuit/aic-api.json"
+# Longer than the daily schedule, so the run after an outage fails fast
+# instead of waiting out a trial call; the one after that tries the API again
+DEFAULT_CIRCUIT_RESET_SECONDS = 25 * 60 * 60
+# Days of artworks kept in reserve for upstream outages
+DEFAULT_RESERVE_DAYS = 3
+
+
+def get_artwork_count():
+    """Get number of artworks to fetch per daily run"""
+    import os
+
+    return max(1, int(os.environ.get("ARTWORKS_PER_DAY", DEFAULT_ARTWORK_COUNT)))
+
+
+def get_api_base_url():
+    """Get API base URL, overridable to point at a local stand-in server"""
+    import os
+
+    return os.environ.get("AIC_API_BASE_URL", DEFAULT_API_BASE_URL).rstrip("/")
+
+
+def get_api_timeout():
+    """Get the per-request timeout for upstream API calls, in seconds"""
+    import os
+
+    return float(os.environ.get("AIC_API_TIMEOUT", DEFAULT_API_TIMEOUT))
+
+
+def get_resilience_config():
+    """Get circuit breaker and reserve settings; None when no state bucket is set"""
+    import os
+
+    bucket_name = os.environ.get("STATE_BUCKET_NAME")
+    if not bucket_name:
+        return None
 
-def get_total_artworks():
+    return {
+        "bucket_name": bucket_name,
+        "failure_threshold": int(
+            os.environ.get("CIRCUIT_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD)
+        ),
+        "reset_timeout": int(
+            os.environ.get("CIRCUIT_RESET_SECONDS", DEFAULT_CIRCUIT_RESET_SECONDS)
+        ),
+        "reserve_days": int(os.environ.get("RESERVE_DAYS", DEFAULT_RESERVE_DAYS)),
+        "table_name": os.environ.get("DYNAMODB_TABLE_NAME"),
+    }
+
+
+def is_upstream_failure(error):
+    """Client errors other than throttling are our bug, not an unhealthy API"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code == 429
+    return True
+
+
+def request_json(url, breaker=None):
+    """GET a JSON document from the API, through the circuit breaker if given"""
+
+    def fetch():
+        request = urllib.request.Request(url)
+        request.add_header("User-Agent", "CloudGallery/1.0")
+
+        with urllib.request.urlopen(request, timeout=get_api_timeout()) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    if breaker is None:
+        return fetch()
+    return breaker.call(fetch)
+
+
+def get_total_artworks(breaker=None):
     """Get total number of artworks available in API"""
-    base_url = "https://api.artic.edu/api/v1/artworks"
+    base_url = f"{get_api_base_url()}/artworks"
     params = {"limit": 1, "fields": "id"}
     
     query_string = "&".join([f"{k}={v}" for k, v in params.items()])
     url = f"{base_url}?{query_string}"
     
     try:
-        request = urllib.request.Request(url)
-        request.add_header("User-Agent", "CloudGallery/1.0")
-        
-        with urllib.request.urlopen(request, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
-            pagination = data.get("pagination", {})
-            total = pagination.get("total", 10000)  # Fallback to max pagination limit
-            # Limit to 10,000 due to API pagination constraints
-            return min(total, 10000)
-            
+        data = request_json(url, breaker)
+        pagination = data.get("pagination", {})
+        total = pagination.get("total", 10000)  # Fallback to max pagination limit
+        # Limit to 10,000 due to API pagination constraints
+        return min(total, 10000)
+
     except Exception as e:
         logger.warning(f"Could not fetch total count, using fallback: {e}")
         return 10000  # Safe fallback
 
 
-def fetch_artworks_from_api():
+def fetch_page(offset, limit, breaker=None):
+    """Fetch one page of artwork records"""
+    params = {"limit": limit, "offset": offset, "fields": API_FIELDS}
+    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
+    url = f"{get_api_base_url()}/artworks?{query_string}"
+
+    data = request_json(url, breaker)
+    page = data.get("data", [])
+
+    # Log pagination info for debugging
+    pagination = data.get("pagination", {})
+    logger.info(f"Fetched {len(page)} artworks from offset {offset}. "
+               f"Total pages: {pagination.get('total_pages', 'unknown')}")
+    return page
+
+
+def fetch_artworks_from_api(breaker=None, total_artworks=None):
     """Fetch random artworks from Art Institute of Chicago API"""
-    base_url = "https://api.artic.edu/api/v1/artworks"
-    
     # Get total available artworks
-    total_artworks = get_total_artworks()
+    if total_artworks is None:
+        total_artworks = get_total_artworks(breaker)
     logger.info(f"Total artworks available: {total_artworks}")
     
     # Generate random offset to get different artworks each day
@@ -46,36 +151,33 @@ def fetch_artworks_from_api():
     today_seed = datetime.utcnow().strftime("%Y-%m-%d")
     random.seed(today_seed)
     
+    artwork_count = get_artwork_count()
+
     # Ensure we don't go beyond available data
-    max_offset = max(0, total_artworks - 9)
+    max_offset = max(0, total_artworks - artwork_count)
     random_offset = random.randint(0, max_offset)
     
     logger.info(f"Using random offset: {random_offset}")
-    
-    params = {
-        "limit": 9,
-        "offset": random_offset,
-        "fields": "id,title,artist_display,date_display,image_id"
-    }
 
-    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-    url = f"{base_url}?{query_string}"
+    artworks = []
 
     try:
-        request = urllib.request.Request(url)
-        request.add_header("User-Agent", "CloudGallery/1.0")
+        # The API caps page size, so larger days are fetched in several requests
+        while len(artworks) < artwork_count:
+            page = fetch_page(
+                random_offset + len(artworks),
+                min(API_MAX_LIMIT, artwork_count - len(artworks)),
+                breaker,
+            )
+            if not page:
+                break
+            artworks.extend(page)
 
-        with urllib.request.urlopen(request, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
-            artworks = data.get("data", [])
-            
-            # Log pagination info for debugging
-            pagination = data.get("pagination", {})
-            logger.info(f"Fetched {len(artworks)} artworks from offset {random_offset}. "
-                       f"Total pages: {pagination.get('total_pages', 'unknown')}")
-            
-            return artworks
+        return artworks
 
+    except CircuitOpenError as e:
+        logger.error(f"Skipping API call: {e}")
+        raise
     except urllib.error.HTTPError as e:
         logger.error(f"HTTP error {e.code}: {e.reason}")
         raise
@@ -93,28 +195,90 @@ def process_artwork_data(artworks):
     current_time = datetime.utcnow().isoformat()
 
     for artwork in artworks:
-        if not artwork.get("id") or not artwork.get("title"):
+        try:
+            processed.append(Artwork.from_api(artwork, current_time))
+        except ValueError:
             continue
 
-        processed_artwork = {
-            "artwork_id": str(artwork["id"]),
-            "title": artwork.get("title", "Untitled").strip(),
-            "artist": artwork.get("artist_display", "Unknown Artist").strip(),
-            "date": artwork.get("date_display", "Unknown Date").strip(),
-            "image_id": artwork.get("image_id"),
-            "fetched_at": current_time,
-        }
-        processed.append(processed_artwork)
-
     return processed
 
 
+def get_stored_artwork_ids(table_name, artwork_ids):
+    """Ids among artwork_ids already stored in DynamoDB, i.e. already shown"""
+    ids_by_key = {str(artwork_id): artwork_id for artwork_id in artwork_ids}
+    stored = batch_get_artworks(dynamodb, table_name, ids_by_key, projection="artwork_id")
+    return {ids_by_key[key] for key in stored}
+
+
+def replenish_reserve(reserve, raw_artworks, total_artworks, target, breaker=None):
+    """Top the reserve up from another random slice of the collection"""
+    # Own generator so the day's main selection stays reproducible
+    rng = random.Random(f"reserve-{datetime.utcnow().strftime('%Y-%m-%d')}")
+
+    def fetch_candidates():
+        offset = rng.randint(0, max(0, total_artworks - API_MAX_LIMIT))
+        return fetch_page(offset, API_MAX_LIMIT, breaker)
+
+    return reserve.replenish(
+        fetch_candidates, [artwork.get("id") for artwork in raw_artworks], target
+    )
+
+
+def fetch_with_fallback(config):
+    """Fetch from the API, falling back to the reserve when it is unhealthy.
+
+    Returns (raw artworks, source) where source is "api" or "reserve".
+    """
+    breaker = CircuitBreaker(
+        "aic-api",
+        S3StateStore(s3_client, config["bucket_name"], CIRCUIT_STATE_KEY),
+        failure_threshold=config["failure_threshold"],
+        reset_timeout=config["reset_timeout"],
+        is_failure=is_upstream_failure,
+    )
+    shown_ids = None
+    if config["table_name"]:
+        shown_ids = partial(get_stored_artwork_ids, config["table_name"])
+    reserve = ArtworkReserve(s3_client, config["bucket_name"], shown_ids=shown_ids)
+    artwork_count = get_artwork_count()
+
+    # Never raises; falls back to the API's pagination limit
+    total_artworks = get_total_artworks(breaker)
+
+    try:
+        raw_artworks = fetch_artworks_from_api(breaker, total_artworks)
+    except Exception as e:
+        logger.warning(f"API unavailable, serving artworks from reserve: {e}")
+        raw_artworks = reserve.take(artwork_count)
+        if not raw_artworks:
+            raise RuntimeError(f"API unavailable and reserve is empty: {e}") from e
+        return raw_artworks, "reserve"
+
+    try:
+        replenish_reserve(
+            reserve,
+            raw_artworks,
+            total_artworks,
+            artwork_count * config["reserve_days"],
+            breaker,
+        )
+    except Exception as e:
+        # Today's artworks are already in hand; the reserve can catch up tomorrow
+        logger.warning(f"Could not replenish reserve: {e}")
+
+    return raw_artworks, "api"
+
+
 def lambda_handler(event, context):
     logger.info("Starting artwork fetch process")
 
     try:
-        raw_artworks = fetch_artworks_from_api()
-        logger.info(f"Fetched {len(raw_artworks)} raw artworks")
+        config = get_resilience_config()
+        if config:
+            raw_artworks, source = fetch_with_fallback(config)
+        else:
+            raw_artworks, source = fetch_artworks_from_api(), "api"
+        logger.info(f"Fetched {len(raw_artworks)} raw artworks from {source}")
 
         processed_artworks = process_artwork_data(raw_artworks)
         logger.info(f"Processed {len(processed_artworks)} valid artworks")
@@ -122,8 +286,9 @@ def lambda_handler(event, context):
         return {
             "statusCode": 200,
             "body": {
-                "artworks": processed_artworks,
+                "artworks": [artwork.to_payload() for artwork in processed_artworks],
                 "count": len(processed_artworks),
+                "source": source,
                 "message": "Successfully fetched artworks",
             },
         }
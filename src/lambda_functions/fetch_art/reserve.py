@@ -0,0 +1,93 @@
+"""
+Reserve of not-yet-shown artworks cached in S3.
+
+While the API is healthy the daily run tops the reserve up with extra raw
+API records; during an outage the run is served from it instead.
+"""
+
+import json
+import logging
+
+from botocore.exceptions import ClientError  # type: ignore
+
+logger = logging.getLogger()
+
+RESERVE_KEY = "reserve/artworks.json"
+
+
+class ArtworkReserve:
+    """Raw API artwork records kept in S3 for outages.
+
+    shown_ids, when given, is called with candidate ids and returns those
+    already shown on an earlier day; they are never added to the reserve.
+    """
+
+    def __init__(self, s3_client, bucket_name, key=RESERVE_KEY, shown_ids=None):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.shown_ids = shown_ids or (lambda ids: set())
+
+    def load(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return []
+            raise
+        return json.loads(response["Body"].read().decode("utf-8"))
+
+    def save(self, records):
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            Body=json.dumps(records, separators=(",", ":")),
+            ContentType="application/json",
+        )
+
+    def take(self, count):
+        """Remove and return up to count records so they aren't shown twice"""
+        records = self.load()
+        taken, remaining = records[:count], records[count:]
+        if taken:
+            self.save(remaining)
+        logger.info(f"Took {len(taken)} artworks from reserve, {len(remaining)} left")
+        return taken
+
+    def replenish(self, fetch_candidates, exclude_ids, target):
+        """Top the reserve up to target records that haven't been shown.
+
+        Records in exclude_ids (today's artworks) are dropped from the
+        reserve; fetch_candidates() is only called when it is then short.
+        """
+        exclude = set(exclude_ids)
+        stored = self.load()
+        records = [record for record in stored if record.get("id") not in exclude]
+        pruned = len(stored) - len(records)
+
+        added = 0
+        if len(records) < target:
+            seen = {record.get("id") for record in records} | exclude
+            candidates = [
+                record
+                for record in fetch_candidates()
+                if record.get("id") and record.get("title") and record["id"] not in seen
+            ]
+            shown = self.shown_ids([record["id"] for record in candidates])
+
+            for record in candidates:
+                if len(records) >= target:
+                    break
+                if record["id"] in seen or record["id"] in shown:
+                    continue
+                records.append(record)
+                seen.add(record["id"])
+                added += 1
+
+        if added or pruned:
+            self.save(records)
+        logger.info(
+            f"Added {added} and dropped {pruned} reserve artworks, "
+            f"now {len(records)}/{target}"
+        )
+        return added
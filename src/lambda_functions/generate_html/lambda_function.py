@@ -1,7 +1,19 @@
 import boto3  # type: ignore
+import html
+import json
 import logging
+import math
 from datetime import datetime
-from botocore.exceptions import ClientError  # type: ignore
+
+from cloud_gallery.artwork import Artwork
+from cloud_gallery.batch_get import batch_get_artworks
+
+from publisher import DEFAULT_MAX_WORKERS, S3Publisher, SiteObject
+
+try:
+    import recommendations
+except ImportError:  # NumPy is provided by an optional Lambda layer
+    recommendations = None
 
 # Configure logging
 logger = logging.getLogger()
@@ -11,6 +23,22 @@ logger.setLevel(logging.INFO)
 s3_client = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
 
+DEFAULT_IIIF_BASE_URL = "https://www.artic.edu/iiif/2"
+
+# Page sizing bounds; the actual page size is derived from the day's artwork count
+MIN_PAGE_SIZE = 3
+MAX_PAGE_SIZE = 12
+
+# S3 prefix for the JSON page chunks fetched by the client on navigation
+PAGE_CHUNK_PREFIX = "pages"
+
+# S3 prefix for the per-day related artworks JSON
+RELATED_PREFIX = "related"
+ARTWORK_PAGE_URL = "https://www.artic.edu/artworks"
+
+# GSI on date_fetched, so a day's artworks are read without scanning the archive
+DATE_INDEX_NAME = "DateIndex"
+
 
 def get_environment_variables():
     """Get required environment variables"""
@@ -25,38 +53,123 @@ def get_environment_variables():
     return bucket_name, table_name
 
 
+def get_state_bucket_name():
+    """Private bucket holding the related-artworks index; None when not set"""
+    import os
+
+    return os.environ.get("STATE_BUCKET_NAME")
+
+
+def get_iiif_base_url():
+    """Get IIIF image base URL, overridable to point at a local stand-in server"""
+    import os
+
+    return os.environ.get("AIC_IIIF_BASE_URL", DEFAULT_IIIF_BASE_URL).rstrip("/")
+
+
 def get_image_url(image_id, backup_check=True):
     """Generate Art Institute image URL with fallback"""
     if not image_id:
         return None
 
+    iiif_base_url = get_iiif_base_url()
+
     # Primary image URL
-    primary_url = f"https://www.artic.edu/iiif/2/{image_id}/full/843,/0/default.jpg"
+    primary_url = f"{iiif_base_url}/{image_id}/full/843,/0/default.jpg"
 
     # Alternative smaller size that might be more reliable
-    fallback_url = f"https://www.artic.edu/iiif/2/{image_id}/full/400,/0/default.jpg"
+    fallback_url = f"{iiif_base_url}/{image_id}/full/400,/0/default.jpg"
 
     return primary_url, fallback_url
 
 
-def validate_artwork_data(artwork):
-    """Enhanced artwork validation"""
-    # Ensure required fields exist
-    artwork["title"] = artwork.get("title", "Untitled").strip()
-    artwork["artist"] = artwork.get("artist", "Unknown Artist").strip()
-    artwork["date"] = artwork.get("date", "Unknown Date").strip()
+def get_page_size(artwork_count):
+    """Derive artworks per page from the day's count (3 per page for 9 artworks)"""
+    page_size = math.ceil(math.sqrt(max(artwork_count, 1)))
+    return max(MIN_PAGE_SIZE, min(page_size, MAX_PAGE_SIZE))
+
+
+def paginate_artworks(artworks):
+    """Split artworks into pages"""
+    page_size = get_page_size(len(artworks))
+
+    pages = [
+        artworks[start : start + page_size]
+        for start in range(0, len(artworks), page_size)
+    ]
+    return pages or [[]]
+
+
+def get_page_chunk_prefix(date_key):
+    """S3 key prefix for a day's page chunks"""
+    return f"{PAGE_CHUNK_PREFIX}/{date_key}"
+
+
+def artwork_to_card_data(artwork):
+    """Compact card payload used by the client to render chunked pages"""
+    image_urls = get_image_url(artwork.image_id)
+    primary_url, fallback_url = image_urls if image_urls else (None, None)
+
+    return {
+        "artwork_id": artwork.artwork_id,
+        "title": artwork.title,
+        "artist": artwork.artist,
+        "date": artwork.date,
+        "image_url": primary_url,
+        "fallback_url": fallback_url,
+    }
+
+
+def generate_page_chunks(pages):
+    """Serialize every page after the first as a small JSON document"""
+    chunks = {}
+    for page_number, page_artworks in enumerate(pages[1:], start=2):
+        chunks[page_number] = json.dumps(
+            {
+                "page": page_number,
+                "artworks": [artwork_to_card_data(a) for a in page_artworks],
+            },
+            separators=(",", ":"),
+        )
+    return chunks
+
+
+def render_artwork_card(artwork):
+    """Render a single artwork card for the inlined first page"""
+    title = html.escape(artwork.title)
+    image_urls = get_image_url(artwork.image_id)
 
-    # Clean up empty or very short titles
-    if len(artwork["title"]) < 2:
-        artwork["title"] = "Untitled"
+    if image_urls:
+        primary_url, fallback_url = image_urls
+        # Create image with fallback
+        image_html = f"""
+                    <img src="{primary_url}"
+                         alt="{title}"
+                         class="artwork-image"
+                         onerror="this.onerror=null; this.src='{fallback_url}'; if(this.src==='{fallback_url}' && this.complete && this.naturalWidth===0) {{this.style.display='none'; this.nextElementSibling.style.display='flex';}}"
+                    >
+                    <div class="artwork-image" style="display:none;">Image not available</div>
+                """
+    else:
+        image_html = '<div class="artwork-image">Image not available</div>'
 
-    return artwork
+    return f"""
+                <div class="artwork-card" data-artwork-id="{html.escape(artwork.artwork_id)}">
+                    {image_html}
+                    <div class="artwork-info">
+                        <div class="artwork-title">{title}</div>
+                        <div class="artwork-artist">{html.escape(artwork.artist)}</div>
+                        <div class="artwork-date">{html.escape(artwork.date)}</div>
+                    </div>
+                </div>
+"""
 
 
-def generate_html_content(artworks):
-    """Generate complete HTML content for the gallery"""
+def generate_html_content(pages, chunk_prefix, related_url=None):
+    """Generate HTML for the gallery with only the first page inlined"""
 
     current_date = datetime.utcnow().strftime("%B %d, %Y")
+    total_pages = len(pages)
 
     html_content = f"""
 <!DOCTYPE html>
@@ -166,6 +279,23 @@ def generate_html_content(artworks):
             font-size: 0.9rem;
         }}
         
+        .artwork-related {{
+            margin-top: 12px;
+            padding-top: 10px;
+            border-top: 1px solid #e9ecef;
+            color: #7f8c8d;
+            font-size: 0.85rem;
+        }}
+        
+        .artwork-related a {{
+            color: #667eea;
+            text-decoration: none;
+        }}
+        
+        .artwork-related a:hover {{
+            text-decoration: underline;
+        }}
+        
         .controls {{
             text-align: center;
             margin-top: 30px;
@@ -244,61 +374,26 @@ def generate_html_content(artworks):
         <div class="gallery-container">
             <div class="controls">
                 <div class="page-indicator">
-                    <span id="currentPage">1</span> of <span id="totalPages">3</span>
+                    <span id="currentPage">1</span> of <span id="totalPages">{total_pages}</span>
                 </div>
             </div>
-"""
-
-    # Generate artwork grids (3 artworks per page)
-    for page in range(3):
-        start_idx = page * 3
-        end_idx = min(start_idx + 3, len(artworks))
-        page_artworks = artworks[start_idx:end_idx]
-
-        active_class = "active" if page == 0 else ""
 
-        html_content += f"""
-            <div class="artwork-grid {active_class}" id="page{page + 1}">
+            <div class="artwork-grid active" id="page1">
 """
 
-        for artwork in page_artworks:
-            # Validate and clean artwork data
-            artwork = validate_artwork_data(artwork)
-
-            image_urls = get_image_url(artwork.get("image_id"))
-
-            if image_urls:
-                primary_url, fallback_url = image_urls
-                # Create image with fallback
-                image_html = f"""
-                    <img src="{primary_url}" 
-                         alt="{artwork['title']}" 
-                         class="artwork-image"
-                         onerror="this.onerror=null; this.src='{fallback_url}'; if(this.src==='{fallback_url}' && this.complete && this.naturalWidth===0) {{this.style.display='none'; this.nextElementSibling.style.display='flex';}}"
-                    >
-                    <div class="artwork-image" style="display:none;">Image not available</div>
-                """
-            else:
-                image_html = '<div class="artwork-image">Image not available</div>'
+    # Only the first page is inlined; later pages are fetched as JSON chunks
+    for artwork in pages[0]:
+        html_content += render_artwork_card(artwork)
 
-            html_content += f"""
-                <div class="artwork-card">
-                    {image_html}
-                    <div class="artwork-info">
-                        <div class="artwork-title">{artwork['title']}</div>
-                        <div class="artwork-artist">{artwork['artist']}</div>
-                        <div class="artwork-date">{artwork['date']}</div>
-                    </div>
-                </div>
-"""
+    html_content += "</div>"
 
-        html_content += "</div>"
+    next_disabled = " disabled" if total_pages <= 1 else ""
 
     # Add JavaScript and completion message
-    html_content += """
-            <div class="controls">
+    html_content += f"""
+            <div class="controls" id="pageControls">
                 <button class="btn" id="prevBtn" onclick="changePage(-1)" disabled>Previous</button>
-                <button class="btn" id="nextBtn" onclick="changePage(1)">Next</button>
+                <button class="btn" id="nextBtn" onclick="changePage(1)"{next_disabled}>Next</button>
             </div>
             
             <div class="completion-message" id="completionMessage">
@@ -309,41 +404,189 @@ def generate_html_content(artworks):
         </div>
     </div>
 
+    <script>
+        const totalPages = {total_pages};
+        const pageChunkPrefix = {json.dumps(chunk_prefix)};
+        const relatedUrl = {json.dumps(related_url)};
+    </script>
+"""
+
+    html_content += """
     <script>
         let currentPage = 1;
-        const totalPages = 3;
+        let pageLoading = false;
+        const pageRequests = {};
+        let relatedRequest = null;
         
-        function changePage(direction) {
-            // Hide current page
-            document.getElementById(`page${currentPage}`).classList.remove('active');
+        function loadRelated() {
+            if (!relatedUrl) {
+                return Promise.resolve({});
+            }
+            if (!relatedRequest) {
+                relatedRequest = fetch(relatedUrl)
+                    .then(response => (response.ok ? response.json() : {}))
+                    .catch(() => ({}));
+            }
+            return relatedRequest;
+        }
+        
+        function renderRelated(root) {
+            loadRelated().then(related => {
+                root.querySelectorAll('.artwork-card[data-artwork-id]').forEach(card => {
+                    const items = related[card.dataset.artworkId];
+                    if (!items || !items.length || card.querySelector('.artwork-related')) {
+                        return;
+                    }
+                    
+                    const container = document.createElement('div');
+                    container.className = 'artwork-related';
+                    container.appendChild(document.createTextNode('Related: '));
+                    items.forEach((item, index) => {
+                        if (index > 0) {
+                            container.appendChild(document.createTextNode(' · '));
+                        }
+                        const link = document.createElement('a');
+                        link.href = item.url;
+                        link.target = '_blank';
+                        link.rel = 'noopener';
+                        link.textContent = item.title;
+                        link.title = item.artist;
+                        container.appendChild(link);
+                    });
+                    card.querySelector('.artwork-info').appendChild(container);
+                });
+            });
+        }
+        
+        function fetchPage(page) {
+            if (!pageRequests[page]) {
+                pageRequests[page] = fetch(`${pageChunkPrefix}/${page}.json`)
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error(`HTTP ${response.status}`);
+                        }
+                        return response.json();
+                    })
+                    .catch(error => {
+                        delete pageRequests[page];
+                        throw error;
+                    });
+            }
+            return pageRequests[page];
+        }
+        
+        function createArtworkCard(artwork) {
+            const card = document.createElement('div');
+            card.className = 'artwork-card';
+            card.dataset.artworkId = artwork.artwork_id;
             
-            // Update page number
-            currentPage += direction;
+            const placeholder = document.createElement('div');
+            placeholder.className = 'artwork-image';
+            placeholder.textContent = 'Image not available';
             
-            // Show new page
-            document.getElementById(`page${currentPage}`).classList.add('active');
+            if (artwork.image_url) {
+                const image = document.createElement('img');
+                image.className = 'artwork-image';
+                image.alt = artwork.title;
+                image.onerror = function () {
+                    if (artwork.fallback_url && this.src !== artwork.fallback_url) {
+                        this.src = artwork.fallback_url;
+                    } else {
+                        this.onerror = null;
+                        this.style.display = 'none';
+                        placeholder.style.display = 'flex';
+                    }
+                };
+                image.src = artwork.image_url;
+                placeholder.style.display = 'none';
+                card.appendChild(image);
+            }
+            card.appendChild(placeholder);
             
-            // Update page indicator
-            document.getElementById('currentPage').textContent = currentPage;
+            const info = document.createElement('div');
+            info.className = 'artwork-info';
+            [['artwork-title', artwork.title], ['artwork-artist', artwork.artist], ['artwork-date', artwork.date]]
+                .forEach(([className, text]) => {
+                    const field = document.createElement('div');
+                    field.className = className;
+                    field.textContent = text;
+                    info.appendChild(field);
+                });
+            card.appendChild(info);
             
-            // Update button states
-            document.getElementById('prevBtn').disabled = (currentPage === 1);
-            document.getElementById('nextBtn').disabled = (currentPage === totalPages);
+            return card;
+        }
+        
+        function getPageGrid(page) {
+            const existing = document.getElementById(`page${page}`);
+            if (existing) {
+                return Promise.resolve(existing);
+            }
             
-            // Show completion message if on last page
-            if (currentPage === totalPages) {
-                setTimeout(() => {
-                    document.getElementById('completionMessage').style.display = 'block';
-                }, 1000);
-            } else {
-                document.getElementById('completionMessage').style.display = 'none';
+            return fetchPage(page).then(data => {
+                const grid = document.createElement('div');
+                grid.className = 'artwork-grid';
+                grid.id = `page${page}`;
+                data.artworks.forEach(artwork => grid.appendChild(createArtworkCard(artwork)));
+                document.getElementById('pageControls').before(grid);
+                renderRelated(grid);
+                return grid;
+            });
+        }
+        
+        function prefetchPage(page) {
+            if (page <= totalPages && !document.getElementById(`page${page}`)) {
+                fetchPage(page).catch(() => {});
+            }
+        }
+        
+        function changePage(direction) {
+            const targetPage = currentPage + direction;
+            if (pageLoading || targetPage < 1 || targetPage > totalPages) {
+                return;
             }
+            
+            pageLoading = true;
+            getPageGrid(targetPage)
+                .then(grid => {
+                    // Hide current page
+                    document.getElementById(`page${currentPage}`).classList.remove('active');
+                    
+                    // Update page number and show new page
+                    currentPage = targetPage;
+                    grid.classList.add('active');
+                    
+                    // Update page indicator
+                    document.getElementById('currentPage').textContent = currentPage;
+                    
+                    // Update button states
+                    document.getElementById('prevBtn').disabled = (currentPage === 1);
+                    document.getElementById('nextBtn').disabled = (currentPage === totalPages);
+                    
+                    // Show completion message if on last page
+                    if (currentPage === totalPages) {
+                        setTimeout(() => {
+                            document.getElementById('completionMessage').style.display = 'block';
+                        }, 1000);
+                    } else {
+                        document.getElementById('completionMessage').style.display = 'none';
+                    }
+                    
+                    prefetchPage(currentPage + 1);
+                })
+                .catch(error => console.error(`Failed to load page ${targetPage}:`, error))
+                .finally(() => {
+                    pageLoading = false;
+                });
         }
         
         function showRandomArt() {
             alert('Random art feature coming soon! This would query DynamoDB for previous artworks.');
             // Future: Implement AJAX call to get random artworks from DynamoDB
         }
+        
+        renderRelated(document.getElementById('page1'));
+        window.addEventListener('load', () => prefetchPage(2));
     </script>
 </body>
 </html>
@@ -353,35 +596,35 @@ def generate_html_content(artworks):
 
 
 def get_latest_artworks_from_dynamodb(table_name):
-    """Fetch latest artworks from DynamoDB"""
+    """Fetch today's artworks from DynamoDB through the date index"""
     table = dynamodb.Table(table_name)
     today = datetime.utcnow().strftime("%Y-%m-%d")
     
     try:
-        response = table.scan(
-            FilterExpression="date_fetched = :date AND #status = :status",
-            ExpressionAttributeValues={
+        query_kwargs = {
+            "IndexName": DATE_INDEX_NAME,
+            "KeyConditionExpression": "date_fetched = :date",
+            "FilterExpression": "#status = :status",
+            "ExpressionAttributeValues": {
                 ":date": today,
                 ":status": "active"
             },
-            ExpressionAttributeNames={
+            "ExpressionAttributeNames": {
                 "#status": "status"
             }
-        )
-        items = response.get('Items', [])
-        
-        # Convert DynamoDB items back to artwork format
-        artworks = []
-        for item in items:
-            artwork = {
-                "artwork_id": item["artwork_id"],
-                "title": item["title"],
-                "artist": item["artist"],
-                "date": item["date_display"],
-                "image_id": item.get("image_id"),
-                "fetched_at": item["fetched_at"]
-            }
-            artworks.append(artwork)
+        }
+        items = []
+        
+        # Follow query pagination so large days aren't cut off at the 1MB page limit
+        while True:
+            response = table.query(**query_kwargs)
+            items.extend(response.get('Items', []))
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        
+        # Convert DynamoDB items back to artwork records
+        artworks = [Artwork.from_dynamodb_item(item) for item in items]
             
         logger.info(f"Retrieved {len(artworks)} artworks from DynamoDB for date {today}")
         return artworks
@@ -391,21 +634,72 @@ def get_latest_artworks_from_dynamodb(table_name):
         return []
 
 
-def upload_to_s3(bucket_name, html_content):
-    """Upload HTML content to S3 bucket"""
-    try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key="index.html",
-            Body=html_content,
-            ContentType="text/html",
-            CacheControl="no-cache",
+def get_artwork_summaries(table_name, artwork_ids):
+    """Batch-read title and artist for artworks from any day"""
+    return batch_get_artworks(
+        dynamodb,
+        table_name,
+        artwork_ids,
+        projection="artwork_id, #title, #artist",
+        attribute_names={"#title": "title", "#artist": "artist"},
+    )
+
+
+def build_related_artworks(state_bucket_name, table_name, artworks):
+    """Map each artwork id to its related artworks for the client"""
+    related_ids = recommendations.compute_related_ids(s3_client, state_bucket_name, artworks)
+
+    summaries = get_artwork_summaries(
+        table_name, {r for ids in related_ids.values() for r in ids}
+    )
+
+    related = {}
+    for artwork_id, ids in related_ids.items():
+        related[artwork_id] = [
+            {
+                "artwork_id": r,
+                "title": summaries[r].get("title", "Untitled"),
+                "artist": summaries[r].get("artist", "Unknown Artist"),
+                "url": f"{ARTWORK_PAGE_URL}/{r}",
+            }
+            for r in ids
+            if r in summaries
+        ]
+    return related
+
+
+def get_publish_settings():
+    """Get S3 publishing settings from the environment"""
+    import os
+
+    return {
+        "max_workers": int(os.environ.get("S3_SYNC_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+        "delete_orphans": os.environ.get("DELETE_ORPHANED_OBJECTS", "false").lower()
+        == "true",
+    }
+
+
+def build_site_objects(html_content, chunk_prefix, chunks, related_key=None, related=None):
+    """Collect every generated object for one publish"""
+    objects = [
+        SiteObject(f"{chunk_prefix}/{page_number}.json", chunk, "application/json")
+        for page_number, chunk in chunks.items()
+    ]
+
+    # Related artworks are optional; the page renders without them
+    if related_key:
+        objects.append(
+            SiteObject(
+                related_key,
+                json.dumps(related, separators=(",", ":")),
+                "application/json",
+                required=False,
+            )
         )
-        logger.info(f"Successfully uploaded HTML to S3 bucket: {bucket_name}")
-        return True
-    except ClientError as e:
-        logger.error(f"Failed to upload to S3: {e}")
-        return False
+
+    # The HTML references everything else, so it is published last
+    objects.append(SiteObject("index.html", html_content, "text/html", deferred=True))
+    return objects
 
 
 def lambda_handler(event, context):
@@ -428,27 +722,63 @@ def lambda_handler(event, context):
             logger.warning("No artworks found in DynamoDB for today's date")
             # Try to get artworks from previous step as fallback
             if "body" in event and "artworks" in event["body"]:
-                artworks = event["body"]["artworks"]
+                artworks = [Artwork.from_payload(a) for a in event["body"]["artworks"]]
                 logger.info(f"Using fallback artworks from event: {len(artworks)} items")
             else:
                 raise ValueError("No artworks found in DynamoDB or event data")
 
         logger.info(f"Generating HTML for {len(artworks)} artworks")
 
-        # Generate HTML content
-        html_content = generate_html_content(artworks)
-
-        # Upload to S3
-        upload_success = upload_to_s3(bucket_name, html_content)
+        date_key = datetime.utcnow().strftime("%Y-%m-%d")
+
+        # Related artworks are an enhancement; never fail the gallery over them
+        related_key = None
+        related = None
+        state_bucket_name = get_state_bucket_name()
+        if recommendations is None:
+            logger.warning("NumPy not available, skipping related artworks")
+        elif not state_bucket_name:
+            logger.warning("STATE_BUCKET_NAME not set, skipping related artworks")
+        else:
+            try:
+                related = build_related_artworks(state_bucket_name, table_name, artworks)
+                related_key = f"{RELATED_PREFIX}/{date_key}.json"
+            except Exception as e:
+                logger.warning(f"Could not build related artworks: {e}")
+
+        # Split into pages; only the first is inlined in the HTML
+        pages = paginate_artworks(artworks)
+        chunk_prefix = get_page_chunk_prefix(date_key)
+
+        # Generate HTML content and the remaining page chunks
+        html_content = generate_html_content(pages, chunk_prefix, related_key)
+        chunks = generate_page_chunks(pages)
+
+        # Publish only what changed since the last run
+        settings = get_publish_settings()
+        publisher = S3Publisher(
+            s3_client, bucket_name, max_workers=settings["max_workers"]
+        )
+        publish_summary = publisher.publish(
+            build_site_objects(html_content, chunk_prefix, chunks, related_key, related),
+            delete_orphans=settings["delete_orphans"],
+        )
 
-        if not upload_success:
-            raise Exception("Failed to upload HTML to S3")
+        # Only required objects fail the run; optional uploads and orphan
+        # deletes are reported in the summary
+        if publish_summary["failed"]:
+            raise Exception(
+                f"Failed to publish {publish_summary['failed']} objects to S3: "
+                f"{publish_summary['errors']}"
+            )
 
         return {
             "statusCode": 200,
             "body": {
                 "message": "Successfully generated and uploaded HTML gallery",
                 "artworks_count": len(artworks),
+                "pages_count": len(pages),
+                "publish": publish_summary,
                 "bucket_name": bucket_name,
                 "url": f"http://{bucket_name}.s3-website-us-east-1.amazonaws.com",
             },
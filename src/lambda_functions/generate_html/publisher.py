@@ -0,0 +1,266 @@
+"""
+Manifest-diffed parallel publishing of generated site objects to S3.
+
+A manifest of content hashes from the previous publish is stored in the
+bucket. Only new or changed objects are uploaded, concurrently, with
+multipart uploads for large bodies. Objects that were published before
+but are no longer generated can optionally be deleted; when deletion is
+disabled they are left in the bucket and dropped from the manifest, so it
+only ever lists what the current site generates. Only keys recorded in
+the manifest are ever considered orphans, so objects written by other
+means are left alone.
+
+Only failures of required objects count as a failed publish. Failed
+uploads of optional objects and failed orphan deletes are reported in
+the summary but never block the deferred objects.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig  # type: ignore
+from botocore.exceptions import ClientError  # type: ignore
+
+logger = logging.getLogger()
+
+MANIFEST_KEY = ".publish-manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+class SiteObject:
+    """A generated object to publish; deferred objects go up last.
+
+    Optional objects (required=False) may fail without failing the publish.
+    """
+
+    __slots__ = (
+        "key",
+        "body",
+        "content_type",
+        "cache_control",
+        "deferred",
+        "required",
+        "digest",
+    )
+
+    def __init__(
+        self,
+        key,
+        body,
+        content_type,
+        cache_control="no-cache",
+        deferred=False,
+        required=True,
+    ):
+        self.key = key
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.deferred = deferred
+        self.required = required
+
+        # Metadata is part of the digest so header changes are republished
+        digest = hashlib.sha256(self.body)
+        digest.update(f"\0{content_type}\0{cache_control}".encode("utf-8"))
+        self.digest = digest.hexdigest()
+
+    @property
+    def size(self):
+        return len(self.body)
+
+
+class S3Publisher:
+    """Publishes SiteObjects to a bucket, skipping unchanged content"""
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name,
+        manifest_key=MANIFEST_KEY,
+        max_workers=DEFAULT_MAX_WORKERS,
+        multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+    ):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.manifest_key = manifest_key
+        self.max_workers = max(1, max_workers)
+        self.multipart_threshold = multipart_threshold
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_threshold,
+        )
+
+    def load_manifest(self):
+        """Read the previous manifest; empty when none has been written"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name, Key=self.manifest_key
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return {}
+            raise
+
+        manifest = json.loads(response["Body"].read().decode("utf-8"))
+        if manifest.get("version") != MANIFEST_VERSION:
+            logger.warning("Ignoring manifest with unknown version, republishing all")
+            return {}
+        return manifest.get("objects", {})
+
+    def save_manifest(self, entries):
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self.manifest_key,
+            Body=json.dumps(
+                {"version": MANIFEST_VERSION, "objects": entries},
+                separators=(",", ":"),
+                sort_keys=True,
+            ),
+            ContentType="application/json",
+            CacheControl="no-cache",
+        )
+
+    def publish(self, objects, delete_orphans=False, force=False):
+        """Upload new or changed objects and return a summary.
+
+        Deferred objects (e.g. the HTML that references everything else) are
+        uploaded only after every other required upload succeeded. "failed"
+        counts required objects only; optional upload failures and orphan
+        delete failures are reported as "optional_failed" and "delete_failed".
+        """
+        started = time.perf_counter()
+        previous = self.load_manifest()
+
+        objects = {obj.key: obj for obj in objects}
+        changed = [
+            obj
+            for obj in objects.values()
+            if force or previous.get(obj.key, {}).get("digest") != obj.digest
+        ]
+        changed_keys = {obj.key for obj in changed}
+        skipped = [obj for obj in objects.values() if obj.key not in changed_keys]
+
+        # Start from the previous state; entries only change once S3 does
+        entries = {key: previous[key] for key in objects if key in previous}
+        errors = []
+        optional_errors = []
+
+        uploaded = []
+        for phase in (
+            [obj for obj in changed if not obj.deferred],
+            [obj for obj in changed if obj.deferred],
+        ):
+            if errors:
+                errors.extend(f"{obj.key}: skipped after earlier failures" for obj in phase)
+                break
+            for obj, error in self._upload_all(phase):
+                if error:
+                    (errors if obj.required else optional_errors).append(
+                        f"{obj.key}: {error}"
+                    )
+                else:
+                    uploaded.append(obj)
+                    entries[obj.key] = {"digest": obj.digest, "size": obj.size}
+
+        deleted = []
+        delete_errors = []
+        orphans = sorted(set(previous) - set(objects))
+        if delete_orphans and orphans:
+            deleted, delete_errors = self._delete_keys(orphans)
+            # Orphans whose delete failed stay tracked so the next run retries them
+            for key in set(orphans) - set(deleted):
+                entries[key] = previous[key]
+
+        self.save_manifest(entries)
+
+        summary = {
+            "uploaded": len(uploaded),
+            "uploaded_bytes": sum(obj.size for obj in uploaded),
+            "skipped": len(skipped),
+            "skipped_bytes": sum(obj.size for obj in skipped),
+            "deleted": len(deleted),
+            "failed": len(errors),
+            "optional_failed": len(optional_errors),
+            "delete_failed": len(delete_errors),
+            "errors": (errors + optional_errors + delete_errors)[:5],  # Limit error details
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(
+            f"Published to {self.bucket_name}: {summary['uploaded']} uploaded "
+            f"({summary['uploaded_bytes']} bytes), {summary['skipped']} unchanged "
+            f"({summary['skipped_bytes']} bytes), {summary['deleted']} deleted, "
+            f"{summary['failed']} failed, {summary['optional_failed']} optional "
+            f"and {summary['delete_failed']} deletes failed"
+        )
+        return summary
+
+    def _upload_all(self, objects):
+        if not objects:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._upload, objects))
+
+    def _upload(self, obj):
+        """Upload one object; returns (obj, error message or None)"""
+        try:
+            if obj.size >= self.multipart_threshold:
+                self.s3_client.upload_fileobj(
+                    io.BytesIO(obj.body),
+                    self.bucket_name,
+                    obj.key,
+                    ExtraArgs={
+                        "ContentType": obj.content_type,
+                        "CacheControl": obj.cache_control,
+                    },
+                    Config=self.transfer_config,
+                )
+            else:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=obj.key,
+                    Body=obj.body,
+                    ContentType=obj.content_type,
+                    CacheControl=obj.cache_control,
+                )
+            return obj, None
+        except ClientError as e:
+            logger.error(f"Failed to upload {obj.key}: {e}")
+            return obj, e.response["Error"].get("Message", str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error uploading {obj.key}: {e}")
+            return obj, str(e)
+
+    def _delete_keys(self, keys):
+        """Delete keys in batches; returns (deleted keys, error messages)"""
+        deleted = []
+        errors = []
+
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start : start + DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": False},
+                )
+            except ClientError as e:
+                message = e.response["Error"].get("Message", str(e))
+                errors.extend(f"{key}: {message}" for key in batch)
+                continue
+
+            deleted.extend(d["Key"] for d in response.get("Deleted", []))
+            errors.extend(
+                f"{e['Key']}: {e.get('Message', e.get('Code'))}"
+                for e in response.get("Errors", [])
+            )
+
+        return deleted, errors
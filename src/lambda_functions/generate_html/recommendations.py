@@ -0,0 +1,273 @@
+"""
+Related artworks from a NumPy nearest-neighbour index.
+
+Each artwork shown in a daily gallery is one row of a float32 feature matrix
+persisted in S3 as a memory-mappable .npy, with a parallel .npy of artwork
+ids. Rows are added as artworks are shown; artworks stored before the index
+existed are not backfilled. Features are fixed-width (dominant colour plus
+hashed taxonomy ids) and rows are unit normalized, so a daily run only
+appends its new rows and ranks neighbours with blocked matrix products;
+existing rows are never recomputed.
+
+Each save writes both files under a new version prefix and then switches a
+small pointer object to it, so readers never see features and ids from
+different runs.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import uuid
+import zlib
+
+import numpy as np  # type: ignore
+from botocore.exceptions import ClientError  # type: ignore
+
+logger = logging.getLogger()
+
+INDEX_PREFIX = "recommendations/index"
+POINTER_KEY = f"{INDEX_PREFIX}/current.json"
+
+DEFAULT_TOP_K = 4
+
+# Feature layout: [s*cos(h), s*sin(h), lightness] + hashed taxonomy buckets
+COLOR_DIMS = 3
+TAXONOMY_HASH_DIMS = 32
+FEATURE_DIMS = COLOR_DIMS + TAXONOMY_HASH_DIMS
+COLOR_WEIGHT = 1.0
+TAXONOMY_WEIGHT = 0.75
+
+# Score-matrix elements per block (~64MB float32); bounds memory as the archive grows
+SCORE_BUDGET = 16 * 1024 * 1024
+MIN_BLOCK_SIZE = 1024
+# Rows copied per step when growing the memory-mapped matrix
+COPY_BLOCK_SIZE = 262144
+
+NEXT_FEATURES_FILE = "features.next.npy"
+NEXT_IDS_FILE = "ids.next.npy"
+
+
+def artwork_features(artwork):
+    """Fixed-width, unit-normalized feature vector for an artwork"""
+    vector = np.zeros(FEATURE_DIMS, dtype=np.float32)
+
+    if artwork.color:
+        hue = math.radians(artwork.color["h"])
+        saturation = artwork.color["s"] / 100
+        vector[0] = COLOR_WEIGHT * saturation * math.cos(hue)
+        vector[1] = COLOR_WEIGHT * saturation * math.sin(hue)
+        vector[2] = COLOR_WEIGHT * (artwork.color["l"] / 100 - 0.5)
+
+    # Feature hashing keeps the width fixed as new taxonomy ids appear
+    for field, value in (artwork.taxonomy or {}).items():
+        bucket = zlib.crc32(f"{field}:{value}".encode("utf-8")) % TAXONOMY_HASH_DIMS
+        vector[COLOR_DIMS + bucket] += TAXONOMY_WEIGHT
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def get_index_keys(version):
+    """S3 keys of the features and ids files of one index version"""
+    return (
+        f"{INDEX_PREFIX}/{version}/features.npy",
+        f"{INDEX_PREFIX}/{version}/ids.npy",
+    )
+
+
+def load_index(s3_client, bucket_name, work_dir):
+    """Download the current index and memory-map it.
+
+    Returns (features, ids, version); empty arrays and no version when no
+    index exists yet.
+    """
+    try:
+        response = s3_client.get_object(Bucket=bucket_name, Key=POINTER_KEY)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            logger.info("No related-artworks index found, starting a new one")
+            return (
+                np.zeros((0, FEATURE_DIMS), dtype=np.float32),
+                np.zeros(0, dtype=np.int64),
+                None,
+            )
+        raise
+
+    version = json.loads(response["Body"].read().decode("utf-8"))["version"]
+    features_path = os.path.join(work_dir, "features.npy")
+    ids_path = os.path.join(work_dir, "ids.npy")
+    features_key, ids_key = get_index_keys(version)
+
+    s3_client.download_file(bucket_name, features_key, features_path)
+    s3_client.download_file(bucket_name, ids_key, ids_path)
+
+    features = np.load(features_path, mmap_mode="r")
+    ids = np.load(ids_path, mmap_mode="r")
+
+    if features.shape[1] != FEATURE_DIMS or len(features) != len(ids):
+        raise ValueError(f"Related-artworks index has unexpected shape {features.shape}")
+
+    return features, ids, version
+
+
+def append_rows(features, ids, artworks, work_dir):
+    """Append rows for artworks not yet indexed.
+
+    The grown matrix is written to a new memory-mapped .npy, copying the
+    existing rows block by block, so the archive is never fully in memory.
+    Returns (features, ids, query row numbers, number of rows appended).
+    """
+    row_by_id = {int(artwork_id): row for row, artwork_id in enumerate(ids)}
+
+    new_artworks = []
+    for artwork in artworks:
+        artwork_id = int(artwork.artwork_id)
+        if artwork_id not in row_by_id:
+            row_by_id[artwork_id] = len(ids) + len(new_artworks)
+            new_artworks.append(artwork)
+
+    query_rows = np.array(
+        [row_by_id[int(a.artwork_id)] for a in artworks], dtype=np.int64
+    )
+
+    if not new_artworks:
+        return features, ids, query_rows, 0
+
+    existing = len(features)
+    grown = np.lib.format.open_memmap(
+        os.path.join(work_dir, NEXT_FEATURES_FILE),
+        mode="w+",
+        dtype=np.float32,
+        shape=(existing + len(new_artworks), FEATURE_DIMS),
+    )
+    for start in range(0, existing, COPY_BLOCK_SIZE):
+        end = min(start + COPY_BLOCK_SIZE, existing)
+        grown[start:end] = features[start:end]
+    grown[existing:] = np.stack([artwork_features(a) for a in new_artworks])
+    grown.flush()
+
+    new_ids = np.array([int(a.artwork_id) for a in new_artworks], dtype=np.int64)
+    return grown, np.concatenate([ids, new_ids]), query_rows, len(new_artworks)
+
+
+def top_k_similar(features, query_rows, k, block_size=None):
+    """Top-k cosine neighbours of the query rows among all other rows.
+
+    No query row is a candidate for any query: the day's artworks are
+    already on the page, so neighbours come from the rest of the archive.
+    Scores the matrix block by block and keeps a running top-k per query,
+    so only one block of the (possibly memory-mapped) matrix is resident.
+    Returns (row indices, scores), each of shape (len(query_rows), k);
+    missing neighbours have index -1.
+    """
+    query_count = len(query_rows)
+    queries = np.asarray(features[query_rows], dtype=np.float32)
+    excluded = np.unique(query_rows)
+    block_size = block_size or max(MIN_BLOCK_SIZE, SCORE_BUDGET // max(query_count, 1))
+
+    best_rows = np.full((query_count, k), -1, dtype=np.int64)
+    best_scores = np.full((query_count, k), -np.inf, dtype=np.float32)
+
+    for start in range(0, len(features), block_size):
+        block = np.asarray(features[start : start + block_size], dtype=np.float32)
+        end = start + len(block)
+
+        scores = queries @ block.T
+
+        # Neither a query itself nor the day's other artworks are candidates
+        in_block = excluded[(excluded >= start) & (excluded < end)]
+        scores[:, in_block - start] = -np.inf
+
+        rows = np.broadcast_to(np.arange(start, end, dtype=np.int64), scores.shape)
+        candidate_scores = np.concatenate([best_scores, scores], axis=1)
+        candidate_rows = np.concatenate([best_rows, rows], axis=1)
+
+        keep = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+        best_rows = np.take_along_axis(candidate_rows, keep, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+    # Vectors without any features score 0 against everything
+    best_rows[~(best_scores > 0)] = -1
+    return best_rows, best_scores
+
+
+def save_index(s3_client, bucket_name, work_dir, ids, previous_version=None):
+    """Upload the grown index as a new version, then point readers at it.
+
+    A failed upload leaves the pointer, and so the previous version, in
+    place. The previous version is removed once nothing points at it.
+    """
+    ids_path = os.path.join(work_dir, NEXT_IDS_FILE)
+    np.save(ids_path, np.ascontiguousarray(ids))
+
+    version = uuid.uuid4().hex
+    features_key, ids_key = get_index_keys(version)
+    for path, key in (
+        (os.path.join(work_dir, NEXT_FEATURES_FILE), features_key),
+        (ids_path, ids_key),
+    ):
+        s3_client.upload_file(
+            path,
+            bucket_name,
+            key,
+            ExtraArgs={"ContentType": "application/octet-stream"},
+        )
+
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=POINTER_KEY,
+        Body=json.dumps({"version": version, "rows": len(ids)}),
+        ContentType="application/json",
+    )
+
+    if previous_version:
+        try:
+            s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={
+                    "Objects": [{"Key": key} for key in get_index_keys(previous_version)]
+                },
+            )
+        except ClientError as e:
+            logger.warning(f"Could not delete index version {previous_version}: {e}")
+
+    return version
+
+
+def compute_related_ids(s3_client, bucket_name, artworks, k=DEFAULT_TOP_K):
+    """Append today's artworks to the index and return their related ids.
+
+    Returns {artwork_id: [related artwork_id, ...]} ordered by similarity.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        features, ids, version = load_index(s3_client, bucket_name, work_dir)
+        features, ids, query_rows, appended = append_rows(
+            features, ids, artworks, work_dir
+        )
+
+        candidates = len(features) - len(np.unique(query_rows))
+        if candidates < 1:
+            related = {artwork.artwork_id: [] for artwork in artworks}
+        else:
+            rows, _ = top_k_similar(features, query_rows, min(k, candidates))
+            related = {
+                artwork.artwork_id: [str(ids[row]) for row in artwork_rows if row >= 0]
+                for artwork, artwork_rows in zip(artworks, rows)
+            }
+
+        if appended:
+            save_index(s3_client, bucket_name, work_dir, ids, previous_version=version)
+
+    logger.info(
+        f"Related-artworks index: {len(ids)} rows, {appended} appended, "
+        f"{len(artworks)} queried"
+    )
+    return related
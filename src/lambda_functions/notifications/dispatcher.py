@@ -0,0 +1,144 @@
+"""
+Digest fan-out for pipeline notifications.
+
+Each digest preference (daily, weekly) has its own SNS topic, and a
+subscriber is a subscription on the topic of their digest. SNS delivers
+every message to each subscription on its topic, so a run publishes one
+message per digest due today and the cost of the stage does not grow with
+the number of subscribers.
+
+Throttling and transport errors are retried with jittered exponential
+backoff; a digest that still fails is reported in the stats instead of
+raising.
+"""
+
+import logging
+import random
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError  # type: ignore
+
+logger = logging.getLogger()
+
+DEFAULT_MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 0.2
+
+RETRYABLE_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "InternalError",
+    "InternalFailure",
+    "ServiceUnavailable",
+}
+
+DIGEST_DAILY = "daily"
+DIGEST_WEEKLY = "weekly"
+DIGEST_PREFERENCES = (DIGEST_DAILY, DIGEST_WEEKLY)
+
+
+def select_digests(today, weekly_digest_day):
+    """Digests due today.
+
+    The daily digest goes out every run; the weekly digest only on
+    weekly_digest_day (0 = Monday, matching datetime.weekday()).
+    """
+    digests = [DIGEST_DAILY]
+    if today.weekday() == weekly_digest_day:
+        digests.append(DIGEST_WEEKLY)
+    return digests
+
+
+class NotificationDispatcher:
+    """Publishes one message per digest to that digest's SNS topic"""
+
+    def __init__(self, sns_client, max_attempts=DEFAULT_MAX_ATTEMPTS, sleep=time.sleep):
+        self.sns_client = sns_client
+        self.max_attempts = max(1, max_attempts)
+        self.sleep = sleep
+
+    def subscriber_count(self, topic_arn):
+        """Confirmed subscriptions on a topic (approximate), or None if unknown"""
+        try:
+            attributes = self.sns_client.get_topic_attributes(TopicArn=topic_arn)
+            return int(attributes["Attributes"].get("SubscriptionsConfirmed", 0))
+        except (BotoCoreError, ClientError, ValueError) as e:
+            logger.warning(f"Could not read subscriber count for {topic_arn}: {e}")
+            return None
+
+    def dispatch(self, digests, topic_arns, messages, subjects):
+        """Publish each digest to its topic and return dispatch statistics.
+
+        topic_arns, messages and subjects are keyed by digest; digests
+        without a topic are skipped.
+        """
+        results = {}
+        errors = []
+        retried = 0
+
+        for digest in digests:
+            topic_arn = topic_arns.get(digest)
+            if not topic_arn:
+                logger.info(f"No topic configured for {digest} digest, skipping")
+                continue
+
+            subscribers = self.subscriber_count(topic_arn)
+            started = time.perf_counter()
+            error, attempts = self._publish(topic_arn, digest, messages[digest], subjects[digest])
+            latency = time.perf_counter() - started
+
+            retried += attempts - 1
+            if error:
+                errors.append(f"{digest}: {error}")
+            results[digest] = {
+                "published": error is None,
+                "subscribers": subscribers,
+                "latency_seconds": round(latency, 3),
+            }
+            logger.info(
+                f"{'Published' if error is None else 'Failed'} {digest} digest to "
+                f"{subscribers} subscribers in {latency:.3f}s"
+            )
+
+        counts = [result["subscribers"] for result in results.values()]
+        return {
+            "digests": results,
+            "published": sum(result["published"] for result in results.values()),
+            "failed": len(errors),
+            "retried": retried,
+            # Approximate, as reported by SNS; None when a topic could not be read
+            "subscribers": None if None in counts else sum(counts),
+            "errors": errors[:5],  # Limit error details
+        }
+
+    def _publish(self, topic_arn, digest, message, subject):
+        """Publish one message with retries; returns (error or None, attempts)"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.sns_client.publish(
+                    TopicArn=topic_arn,
+                    Message=message,
+                    Subject=subject,
+                    MessageAttributes={
+                        "digest": {"DataType": "String", "StringValue": digest},
+                    },
+                )
+                return None, attempt
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+                error = f"{code}: {e.response['Error'].get('Message', '')}"
+                if code not in RETRYABLE_ERROR_CODES:
+                    return error, attempt
+            except BotoCoreError as e:
+                # Connection failures and read timeouts
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.max_attempts:
+                self._backoff(attempt)
+
+        return error, self.max_attempts
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        self.sleep(random.uniform(0, BASE_BACKOFF_SECONDS * (2 ** (attempt - 1))))
@@ -1,9 +1,32 @@
+import boto3  # type: ignore
 import logging
 from datetime import datetime
 
+from dispatcher import DIGEST_DAILY, DIGEST_WEEKLY, NotificationDispatcher, select_digests
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+sns_client = boto3.client("sns")
+
+
+def get_notification_config():
+    """Get subscriber fan-out settings; returns None when not configured"""
+    import os
+
+    topic_arns = {
+        DIGEST_DAILY: os.environ.get("DAILY_DIGEST_TOPIC_ARN"),
+        DIGEST_WEEKLY: os.environ.get("WEEKLY_DIGEST_TOPIC_ARN"),
+    }
+
+    if not any(topic_arns.values()):
+        return None
+
+    return {
+        "topic_arns": topic_arns,
+        "weekly_digest_day": int(os.environ.get("WEEKLY_DIGEST_DAY", 0)),
+    }
+
 
 def log_pipeline_completion(artworks_count, website_url):
     completion_time = datetime.utcnow().isoformat()
@@ -23,7 +46,7 @@ def generate_completion_summary(event):
         website_url = body.get("url", "Unknown")
 
         summary = {
-            "pipeline_status": "SUCCESS",
+            "pipeline_status": event.get("pipeline_status", "SUCCESS"),
             "execution_time": datetime.utcnow().isoformat(),
             "artworks_processed": artworks_count,
             "website_url": website_url,
@@ -46,10 +69,44 @@ def generate_completion_summary(event):
         }
 
 
-def send_completion_notification(summary):
-    # Future enhancement: Send email or SNS notification
-    # For now, just log the notification
+def build_digest_messages(summary):
+    """Build the message and subject for each digest preference"""
+    artworks_count = summary.get("artworks_processed", 0)
+    website_url = summary.get("website_url", "Unknown")
+
+    messages = {
+        DIGEST_DAILY: f"""
+    🎨 Your daily Cloud Gallery is ready!
+    
+    Today's collection: {artworks_count} new pieces
+    Gallery: {website_url}
+    """.strip(),
+        DIGEST_WEEKLY: f"""
+    🎨 Your weekly Cloud Gallery digest
+    
+    Today's collection: {artworks_count} new pieces
+    Gallery: {website_url}
+    """.strip(),
+    }
+    subjects = {
+        DIGEST_DAILY: "Cloud Gallery - Daily Art Collection",
+        DIGEST_WEEKLY: "Cloud Gallery - Weekly Art Digest",
+    }
+
+    return messages, subjects
+
 
+def notify_subscribers(summary, config):
+    """Publish each digest due today to its topic; SNS fans it out"""
+    digests = select_digests(datetime.utcnow(), config["weekly_digest_day"])
+    messages, subjects = build_digest_messages(summary)
+
+    logger.info(f"Publishing digests {digests}")
+    dispatcher = NotificationDispatcher(sns_client)
+    return dispatcher.dispatch(digests, config["topic_arns"], messages, subjects)
+
+
+def send_completion_notification(summary):
     status = summary.get("pipeline_status", "UNKNOWN")
     artworks_count = summary.get("artworks_processed", 0)
     website_url = summary.get("website_url", "Unknown")
@@ -66,9 +123,18 @@ def send_completion_notification(summary):
 
     logger.info(f"NOTIFICATION: {notification_message}")
 
-    # Placeholder for actual notification service
+    result = {"notification_sent": True, "message": notification_message.strip()}
+
+    # Subscribers only hear about successful runs
+    config = get_notification_config()
+    if config is None:
+        logger.info("Subscriber notifications not configured, skipping fan-out")
+    elif status == "SUCCESS":
+        dispatch = notify_subscribers(summary, config)
+        result["dispatch"] = dispatch
+        result["notification_sent"] = dispatch["failed"] == 0
 
-    return {"notification_sent": True, "message": notification_message.strip()}
+    return result
 
 
 def lambda_handler(event, context):
@@ -1,13 +1,18 @@
 import boto3
 import logging
+import urllib.error
+import urllib.request
 from datetime import datetime
-from botocore.exceptions import ClientError
+
+from cloud_gallery.artwork import Artwork
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 dynamodb = boto3.resource("dynamodb")
 
+DEFAULT_IIIF_BASE_URL = "https://www.artic.edu/iiif/2"
+
 
 def get_table_name():
     import os
@@ -18,105 +23,123 @@ def get_table_name():
     return table_name
 
 
-def prepare_item_for_dynamodb(artwork, date_fetched):
-    item = {
-        "artwork_id": artwork["artwork_id"],
-        "date_fetched": date_fetched,
-        "title": artwork["title"],
-        "artist": artwork["artist"],
-        "date_display": artwork["date"],
-        "fetched_at": artwork["fetched_at"],
-        "status": "active",
-    }
+def get_iiif_base_url():
+    import os
 
-    if artwork.get("image_id"):
-        item["image_id"] = artwork["image_id"]
+    return os.environ.get("AIC_IIIF_BASE_URL", DEFAULT_IIIF_BASE_URL).rstrip("/")
 
-    return item
 
+def check_image_available(image_id):
+    """Check the IIIF server knows an image; None when it can't be determined"""
+    request = urllib.request.Request(f"{get_iiif_base_url()}/{image_id}/info.json")
+    request.add_header("User-Agent", "CloudGallery/1.0")
 
-def store_artworks_in_dynamodb(artworks):
-    table_name = get_table_name()
-    table = dynamodb.Table(table_name)
+    try:
+        with urllib.request.urlopen(request, timeout=5):
+            return True
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return False
+        logger.warning(f"Image check for {image_id} returned HTTP {e.code}")
+        return None
+    except (urllib.error.URLError, OSError) as e:
+        logger.warning(f"Image check for {image_id} failed: {e}")
+        return None
+
+
+def enrich_artwork(artwork):
+    """Per-item enrichment: drop image references the IIIF server doesn't have"""
+    if artwork.image_id and check_image_available(artwork.image_id) is False:
+        logger.info(f"Image {artwork.image_id} unavailable for artwork {artwork.artwork_id}")
+        artwork.image_id = None
+    return artwork
+
+
+def build_store_response(stored_count, total_artworks, errors, artworks):
+    """Build the response shape CheckProcessResults and GenerateHTML expect"""
+    if stored_count == 0:
+        status_code = 500
+        message = "Failed to store any artworks"
+    elif errors:
+        status_code = 207  # Partial success
+        message = f"Stored {stored_count} artworks with {len(errors)} errors"
+    else:
+        status_code = 200
+        message = f"Successfully stored {stored_count} artworks"
+
+    logger.info(message)
+
+    return {
+        "statusCode": status_code,
+        "body": {
+            "stored_count": stored_count,
+            "total_artworks": total_artworks,
+            "message": message,
+            "errors": errors[:5],  # Limit error details
+            "artworks": artworks,  # Pass through for next step
+        },
+    }
 
-    date_fetched = datetime.utcnow().strftime("%Y-%m-%d")
-    stored_count = 0
-    errors = []
 
-    logger.info(f"Storing {len(artworks)} artworks in table: {table_name}")
+def enrich_item_handler(event, context):
+    """
+    Map state entry point: enrich a single artwork.
+    Raises on invalid input so the iteration's Catch can isolate it.
+    """
+    artwork = enrich_artwork(Artwork.from_payload(event["artwork"]))
+    return {"artwork": artwork.to_payload()}
 
-    for artwork in artworks:
-        try:
-            item = prepare_item_for_dynamodb(artwork, date_fetched)
 
-            table.put_item(Item=item)
-            stored_count += 1
+def store_item_handler(event, context):
+    """
+    Map state entry point: store a single artwork in DynamoDB.
+    Errors propagate so Step Functions can retry, then isolate, the item.
+    Returns only the id; ReduceResults joins it back to the fetched artwork.
+    """
+    artwork = Artwork.from_payload(event["artwork"])
+    date_fetched = datetime.utcnow().strftime("%Y-%m-%d")
 
-            logger.debug(f"Stored artwork: {artwork['artwork_id']}")
+    table = dynamodb.Table(get_table_name())
+    table.put_item(Item=artwork.to_dynamodb_item(date_fetched))
 
-        except ClientError as e:
-            error_msg = f"Failed to store artwork {artwork['artwork_id']}: {e.response['Error']['Message']}"
-            logger.error(error_msg)
-            errors.append(error_msg)
-        except Exception as e:
-            error_msg = (
-                f"Unexpected error storing artwork {artwork['artwork_id']}: {str(e)}"
-            )
-            logger.error(error_msg)
-            errors.append(error_msg)
+    logger.debug(f"Stored artwork: {artwork.artwork_id}")
+    return {"artwork_id": artwork.artwork_id, "stored": True}
 
-    return stored_count, errors
 
+def get_result_artwork_id(result):
+    """Artwork id of a Map result; ItemFailed results carry the whole artwork"""
+    return result.get("artwork_id") or (result.get("artwork") or {}).get("artwork_id")
 
-def lambda_handler(event, context):
-    logger.info("Starting artwork processing and storage")
 
-    try:
-        if "body" in event and "artworks" in event["body"]:
-            artworks = event["body"]["artworks"]
-        else:
-            raise ValueError("No artworks found in event data")
-
-        logger.info(f"Processing {len(artworks)} artworks")
-
-        if not artworks:
-            return {
-                "statusCode": 200,
-                "body": {
-                    "stored_count": 0,
-                    "message": "No artworks to process",
-                    "errors": [],
-                },
-            }
-
-        stored_count, errors = store_artworks_in_dynamodb(artworks)
-
-        if stored_count == 0:
-            status_code = 500
-            message = "Failed to store any artworks"
-        elif errors:
-            status_code = 207  # Partial success
-            message = f"Stored {stored_count} artworks with {len(errors)} errors"
-        else:
-            status_code = 200
-            message = f"Successfully stored {stored_count} artworks"
-
-        logger.info(message)
+def reduce_handler(event, context):
+    """
+    Reduce per-item Map results back into the single-invocation response shape
+    """
+    item_results = event.get("item_results") or []
+    logger.info(f"Reducing {len(item_results)} per-item results")
 
+    if not item_results:
         return {
-            "statusCode": status_code,
+            "statusCode": 200,
             "body": {
-                "stored_count": stored_count,
-                "total_artworks": len(artworks),
-                "message": message,
-                "errors": errors[:5],  # Limit error details
-                "artworks": artworks,  # Pass through for next step
+                "stored_count": 0,
+                "message": "No artworks to process",
+                "errors": [],
+                "artworks": [],
             },
         }
 
-    except Exception as e:
-        logger.error(f"Error processing artworks: {str(e)}")
-        return {
-            "statusCode": 500,
-            "body": {"stored_count": 0, "error": str(e), "artworks": []},
-        }
+    stored_ids = {
+        str(get_result_artwork_id(r)) for r in item_results if r.get("stored")
+    }
+    errors = [
+        f"Failed to store artwork {get_result_artwork_id(r)}: "
+        f"{r.get('error', 'Unknown error')}"
+        for r in item_results
+        if not r.get("stored")
+    ]
+    stored = [
+        a for a in event.get("artworks") or [] if str(a.get("artwork_id")) in stored_ids
+    ]
+
+    return build_store_response(len(stored_ids), len(item_results), errors, stored)
@@ -0,0 +1 @@
+"""Code shared by the Cloud Gallery Lambda functions (deployed as a layer)"""
@@ -0,0 +1,183 @@
+"""
+Artwork record shared by every pipeline stage.
+
+Validation and normalization happen once, at construction. The serializers
+map the record between the shapes it travels in. API JSON is only ever read:
+the outage reserve keeps raw API records as fetched, so there is no to_api.
+
+    API JSON        id, title, artist_display, date_display, image_id, color, ...
+    DynamoDB item   artwork_id, date_fetched, title, artist, date_display, ...
+    Stage payload   artwork_id, title, artist, date, image_id, fetched_at, ...
+
+color (dominant HSL) and taxonomy ids are optional and feed the related
+artworks index.
+"""
+
+DEFAULT_TITLE = "Untitled"
+DEFAULT_ARTIST = "Unknown Artist"
+DEFAULT_DATE = "Unknown Date"
+
+# Titles shorter than this are treated as missing
+MIN_TITLE_LENGTH = 2
+
+# Taxonomy fields requested from the API alongside the core fields
+TAXONOMY_FIELDS = ("artwork_type_id", "department_id", "classification_id", "style_id")
+API_FIELDS = ",".join(
+    ("id", "title", "artist_display", "date_display", "image_id", "color")
+    + TAXONOMY_FIELDS
+)
+
+
+def _clean(value, default):
+    """Strip a text field, falling back to the default when empty"""
+    if value is None:
+        return default
+    value = str(value).strip()
+    return value or default
+
+
+def _clean_color(color):
+    """Keep only dominant hue/lightness/saturation as ints, or None"""
+    if not color:
+        return None
+    try:
+        return {key: int(color[key]) for key in ("h", "l", "s")}
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _clean_taxonomy(taxonomy):
+    if not taxonomy:
+        return None
+    cleaned = {
+        field: str(taxonomy[field])
+        for field in TAXONOMY_FIELDS
+        if taxonomy.get(field) is not None
+    }
+    return cleaned or None
+
+
+class Artwork:
+    """Compact, normalized artwork record"""
+
+    __slots__ = (
+        "artwork_id",
+        "title",
+        "artist",
+        "date",
+        "image_id",
+        "fetched_at",
+        "color",
+        "taxonomy",
+    )
+
+    def __init__(
+        self,
+        artwork_id,
+        title=None,
+        artist=None,
+        date=None,
+        image_id=None,
+        fetched_at=None,
+        color=None,
+        taxonomy=None,
+    ):
+        if artwork_id is None or str(artwork_id).strip() == "":
+            raise ValueError("Artwork requires an artwork_id")
+
+        title = _clean(title, DEFAULT_TITLE)
+        if len(title) < MIN_TITLE_LENGTH:
+            title = DEFAULT_TITLE
+
+        self.artwork_id = str(artwork_id).strip()
+        self.title = title
+        self.artist = _clean(artist, DEFAULT_ARTIST)
+        self.date = _clean(date, DEFAULT_DATE)
+        self.image_id = image_id or None
+        self.fetched_at = fetched_at
+        self.color = _clean_color(color)
+        self.taxonomy = _clean_taxonomy(taxonomy)
+
+    def __repr__(self):
+        return f"Artwork(artwork_id={self.artwork_id!r}, title={self.title!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Artwork):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    @classmethod
+    def from_api(cls, data, fetched_at):
+        """Build from an Art Institute API record; raises ValueError if unusable"""
+        if not data.get("id") or not data.get("title"):
+            raise ValueError("API record is missing id or title")
+
+        return cls(
+            data["id"],
+            data["title"],
+            data.get("artist_display"),
+            data.get("date_display"),
+            data.get("image_id"),
+            fetched_at,
+            data.get("color"),
+            data,
+        )
+
+    @classmethod
+    def from_dynamodb_item(cls, item):
+        return cls(
+            item["artwork_id"],
+            item.get("title"),
+            item.get("artist"),
+            item.get("date_display"),
+            item.get("image_id"),
+            item.get("fetched_at"),
+            item.get("color"),
+            item.get("taxonomy"),
+        )
+
+    def to_dynamodb_item(self, date_fetched, status="active"):
+        item = {
+            "artwork_id": self.artwork_id,
+            "date_fetched": date_fetched,
+            "title": self.title,
+            "artist": self.artist,
+            "date_display": self.date,
+            "fetched_at": self.fetched_at,
+            "status": status,
+        }
+
+        if self.image_id:
+            item["image_id"] = self.image_id
+        if self.color:
+            item["color"] = self.color
+        if self.taxonomy:
+            item["taxonomy"] = self.taxonomy
+
+        return item
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build from the JSON payload passed between Step Functions states"""
+        return cls(
+            payload.get("artwork_id"),
+            payload.get("title"),
+            payload.get("artist"),
+            payload.get("date"),
+            payload.get("image_id"),
+            payload.get("fetched_at"),
+            payload.get("color"),
+            payload.get("taxonomy"),
+        )
+
+    def to_payload(self):
+        return {
+            "artwork_id": self.artwork_id,
+            "title": self.title,
+            "artist": self.artist,
+            "date": self.date,
+            "image_id": self.image_id,
+            "fetched_at": self.fetched_at,
+            "color": self.color,
+            "taxonomy": self.taxonomy,
+        }
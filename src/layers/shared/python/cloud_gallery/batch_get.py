@@ -0,0 +1,67 @@
+"""
+Batched reads of artworks by id from the DynamoDB table.
+
+BatchGetItem reads at most 100 keys per request and, when the table is
+throttled, returns the keys it did not read as UnprocessedKeys. Those are
+retried with jittered exponential backoff rather than resent immediately,
+which would only be throttled again.
+"""
+
+import logging
+import random
+import time
+
+logger = logging.getLogger()
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+DEFAULT_MAX_ATTEMPTS = 8
+BASE_BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 2.0
+
+
+def batch_get_artworks(
+    dynamodb,
+    table_name,
+    artwork_ids,
+    projection=None,
+    attribute_names=None,
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    sleep=time.sleep,
+):
+    """Read items by artwork_id; returns {artwork_id: item} for those stored.
+
+    dynamodb is a boto3 DynamoDB service resource. Raises RuntimeError when
+    keys are still unprocessed after max_attempts requests.
+    """
+    keys = sorted({str(artwork_id) for artwork_id in artwork_ids})
+    items = {}
+
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        batch = keys[start : start + BATCH_GET_LIMIT]
+        request = {"Keys": [{"artwork_id": key} for key in batch]}
+        if projection:
+            request["ProjectionExpression"] = projection
+        if attribute_names:
+            request["ExpressionAttributeNames"] = attribute_names
+        request_items = {table_name: request}
+
+        for attempt in range(1, max_attempts + 1):
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for item in response.get("Responses", {}).get(table_name, []):
+                items[item["artwork_id"]] = item
+
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+            if attempt == max_attempts:
+                unprocessed = len(request_items[table_name]["Keys"])
+                raise RuntimeError(
+                    f"{unprocessed} keys still unprocessed after {max_attempts} attempts"
+                )
+
+            delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+            logger.info(f"Retrying {len(request_items[table_name]['Keys'])} unprocessed keys")
+            sleep(random.uniform(0, delay))
+
+    return items
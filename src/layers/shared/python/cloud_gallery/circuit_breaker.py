@@ -0,0 +1,136 @@
+"""
+Circuit breaker for upstream calls, with state persisted across invocations.
+
+CLOSED    calls pass through; consecutive failures are counted
+OPEN      calls fail fast with CircuitOpenError until reset_timeout elapses
+HALF_OPEN one trial call is let through; success closes, failure reopens
+
+Lambda invocations don't share memory, so the state lives in a small JSON
+object in S3 and is only written when it changes.
+"""
+
+import json
+import logging
+import time
+
+from botocore.exceptions import ClientError  # type: ignore
+
+logger = logging.getLogger()
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 1800
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream known to be unhealthy"""
+
+
+class S3StateStore:
+    """Persists breaker state as a JSON object in S3"""
+
+    def __init__(self, s3_client, bucket_name, key):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+
+    def load(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(response["Body"].read().decode("utf-8"))
+
+    def save(self, state):
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            Body=json.dumps(state),
+            ContentType="application/json",
+        )
+
+
+class CircuitBreaker:
+    """Wraps upstream calls and trips after repeated failures"""
+
+    def __init__(
+        self,
+        name,
+        store,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout=DEFAULT_RESET_TIMEOUT,
+        is_failure=None,
+        clock=time.time,
+    ):
+        self.name = name
+        self.store = store
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.clock = clock
+        self._state = None
+
+    @property
+    def state(self):
+        if self._state is None:
+            try:
+                self._state = self.store.load() or {}
+            except Exception as e:
+                # An unreadable state store must not take the pipeline down
+                logger.warning(f"Could not load circuit state for {self.name}: {e}")
+                self._state = {}
+            self._state.setdefault("state", CLOSED)
+            self._state.setdefault("failures", 0)
+        return self._state
+
+    def allow_request(self):
+        state = self.state
+        if state["state"] == OPEN:
+            if self.clock() - state.get("opened_at", 0) < self.reset_timeout:
+                return False
+            state["state"] = HALF_OPEN
+            logger.info(f"Circuit {self.name} half-open, allowing a trial call")
+        return True
+
+    def record_success(self):
+        state = self.state
+        if state["state"] != CLOSED or state["failures"]:
+            if state["state"] != CLOSED:
+                logger.info(f"Circuit {self.name} closed after a successful call")
+            self._update(state=CLOSED, failures=0, opened_at=None)
+
+    def record_failure(self):
+        state = self.state
+        failures = state["failures"] + 1
+        if state["state"] == HALF_OPEN or failures >= self.failure_threshold:
+            logger.warning(f"Circuit {self.name} opened after {failures} failures")
+            self._update(state=OPEN, failures=failures, opened_at=self.clock())
+        else:
+            self._update(failures=failures)
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker; raises CircuitOpenError when open"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            raise
+
+        self.record_success()
+        return result
+
+    def _update(self, **changes):
+        self.state.update(changes)
+        try:
+            self.store.save(self.state)
+        except Exception as e:
+            logger.warning(f"Could not persist circuit state for {self.name}: {e}")
@@ -9,6 +9,26 @@ module "s3_website" {
   }
 }
 
+# Private bucket for pipeline state: circuit breaker, artwork reserve and
+# related-artworks index
+resource "aws_s3_bucket" "pipeline_state" {
+  bucket = coalesce(var.state_bucket_name, "${var.website_bucket_name}-state")
+
+  tags = {
+    Component   = "PipelineState"
+    Environment = var.environment
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "pipeline_state" {
+  bucket = aws_s3_bucket.pipeline_state.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
 module "dynamodb" {
   source = "./modules/dynamodb"
   
@@ -20,27 +40,131 @@ module "dynamodb" {
   }
 }
 
+data "archive_file" "shared_layer_zip" {
+  type        = "zip"
+  source_dir  = "../src/layers/shared"
+  output_path = "../src/layers/shared.zip"
+}
+
+resource "aws_lambda_layer_version" "shared" {
+  layer_name          = "cloud-gallery-shared"
+  description         = "Code shared by the Cloud Gallery Lambda functions"
+  filename            = data.archive_file.shared_layer_zip.output_path
+  source_code_hash    = data.archive_file.shared_layer_zip.output_base64sha256
+  compatible_runtimes = ["python3.9"]
+}
+
 module "lambda_fetch_art" {
   source = "./modules/lambda"
   
   function_name = var.lambda_fetch_art_name
   environment   = var.environment
   source_dir    = "../src/lambda_functions/fetch_art"
+  layers        = [aws_lambda_layer_version.shared.arn]
   timeout       = 30
   
+  environment_variables = {
+    ARTWORKS_PER_DAY          = tostring(var.artworks_per_day)
+    STATE_BUCKET_NAME         = aws_s3_bucket.pipeline_state.id
+    DYNAMODB_TABLE_NAME       = module.dynamodb.table_name
+    AIC_API_TIMEOUT           = tostring(var.aic_api_timeout)
+    CIRCUIT_FAILURE_THRESHOLD = tostring(var.circuit_failure_threshold)
+    CIRCUIT_RESET_SECONDS     = tostring(var.circuit_reset_seconds)
+    RESERVE_DAYS              = tostring(var.reserve_days)
+  }
+  
   tags = {
     Component = "DataFetcher"
   }
 }
 
+resource "aws_iam_policy" "pipeline_state_access" {
+  name = "cloud-gallery-pipeline-state-access"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject", "s3:PutObject"]
+        Resource = "${aws_s3_bucket.pipeline_state.arn}/*"
+      },
+      {
+        # Lets reads of not-yet-written state return 404 instead of 403
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = aws_s3_bucket.pipeline_state.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "lambda_fetch_art_state" {
+  role       = module.lambda_fetch_art.role_name
+  policy_arn = aws_iam_policy.pipeline_state_access.arn
+}
+
+# Keeps artworks shown on earlier days out of the reserve; read-only
+resource "aws_iam_policy" "shown_artworks_read" {
+  name = "cloud-gallery-shown-artworks-read"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["dynamodb:BatchGetItem"]
+        Resource = module.dynamodb.table_arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "lambda_fetch_art_dynamodb" {
+  role       = module.lambda_fetch_art.role_name
+  policy_arn = aws_iam_policy.shown_artworks_read.arn
+}
+
 module "lambda_process_store" {
   source = "./modules/lambda"
   
   function_name = var.lambda_process_store_name
   environment   = var.environment
   source_dir    = "../src/lambda_functions/process_store"
+  layers        = [aws_lambda_layer_version.shared.arn]
+  handler       = "lambda_function.reduce_handler"
   timeout       = 60
   
+  tags = {
+    Component = "DataProcessor"
+  }
+}
+
+module "lambda_enrich_item" {
+  source = "./modules/lambda"
+  
+  function_name = var.lambda_enrich_item_name
+  environment   = var.environment
+  source_dir    = "../src/lambda_functions/process_store"
+  layers        = [aws_lambda_layer_version.shared.arn]
+  handler       = "lambda_function.enrich_item_handler"
+  timeout       = 15
+  
+  tags = {
+    Component = "DataProcessor"
+  }
+}
+
+module "lambda_store_item" {
+  source = "./modules/lambda"
+  
+  function_name = var.lambda_store_item_name
+  environment   = var.environment
+  source_dir    = "../src/lambda_functions/process_store"
+  layers        = [aws_lambda_layer_version.shared.arn]
+  handler       = "lambda_function.store_item_handler"
+  timeout       = 15
+  
   environment_variables = {
     DYNAMODB_TABLE_NAME = module.dynamodb.table_name
   }
@@ -64,16 +188,20 @@ resource "aws_iam_policy" "dynamodb_access" {
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:BatchGetItem"
+        ]
+        Resource = [
+          module.dynamodb.table_arn,
+          "${module.dynamodb.table_arn}/index/*"
         ]
-        Resource = module.dynamodb.table_arn
       }
     ]
   })
 }
 
-resource "aws_iam_role_policy_attachment" "lambda_process_store_dynamodb" {
-  role       = module.lambda_process_store.role_name
+resource "aws_iam_role_policy_attachment" "lambda_store_item_dynamodb" {
+  role       = module.lambda_store_item.role_name
   policy_arn = aws_iam_policy.dynamodb_access.arn
 }
 
@@ -83,11 +211,16 @@ module "lambda_generate_html" {
   function_name = var.lambda_generate_html_name
   environment   = var.environment
   source_dir    = "../src/lambda_functions/generate_html"
+  layers        = compact([aws_lambda_layer_version.shared.arn, var.numpy_layer_arn])
   timeout       = 60
+  memory_size   = 512
   
   environment_variables = {
-    S3_BUCKET_NAME      = module.s3_website.bucket_name
-    DYNAMODB_TABLE_NAME = module.dynamodb.table_name
+    S3_BUCKET_NAME          = module.s3_website.bucket_name
+    STATE_BUCKET_NAME       = aws_s3_bucket.pipeline_state.id
+    DYNAMODB_TABLE_NAME     = module.dynamodb.table_name
+    S3_SYNC_MAX_WORKERS     = tostring(var.s3_sync_max_workers)
+    DELETE_ORPHANED_OBJECTS = tostring(var.delete_orphaned_site_objects)
   }
   
   tags = {
@@ -107,9 +240,16 @@ resource "aws_iam_policy" "s3_access" {
           "s3:PutObject",
           "s3:PutObjectAcl",
           "s3:GetObject",
-          "s3:DeleteObject"
+          "s3:DeleteObject",
+          "s3:AbortMultipartUpload"
         ]
         Resource = "${module.s3_website.bucket_arn}/*"
+      },
+      {
+        # Lets reads of a not-yet-written manifest return 404 instead of 403
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = module.s3_website.bucket_arn
       }
     ]
   })
@@ -125,19 +265,85 @@ resource "aws_iam_role_policy_attachment" "lambda_generate_html_dynamodb" {
   policy_arn = aws_iam_policy.dynamodb_access.arn
 }
 
+# The related-artworks index is private, so it lives in the state bucket
+resource "aws_iam_policy" "related_index_access" {
+  name = "cloud-gallery-related-index-access"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject", "s3:PutObject", "s3:DeleteObject"]
+        Resource = "${aws_s3_bucket.pipeline_state.arn}/recommendations/*"
+      },
+      {
+        # Lets the first run's pointer read return 404 instead of 403
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = aws_s3_bucket.pipeline_state.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "lambda_generate_html_related_index" {
+  role       = module.lambda_generate_html.role_name
+  policy_arn = aws_iam_policy.related_index_access.arn
+}
+
+# One topic per digest preference; subscribers subscribe to the topic of
+# their digest and SNS delivers each published digest to all of them
+resource "aws_sns_topic" "notifications" {
+  for_each = toset(["daily", "weekly"])
+
+  name = "${var.notification_topic_name}-${each.key}"
+
+  tags = {
+    Component   = "Notifications"
+    Environment = var.environment
+  }
+}
+
 module "lambda_notifications" {
   source = "./modules/lambda"
   
   function_name = var.lambda_notifications_name
   environment   = var.environment
   source_dir    = "../src/lambda_functions/notifications"
-  timeout       = 30
+  timeout       = 60
+  
+  environment_variables = {
+    DAILY_DIGEST_TOPIC_ARN  = aws_sns_topic.notifications["daily"].arn
+    WEEKLY_DIGEST_TOPIC_ARN = aws_sns_topic.notifications["weekly"].arn
+    WEEKLY_DIGEST_DAY       = tostring(var.weekly_digest_day)
+  }
   
   tags = {
     Component = "Notifications"
   }
 }
 
+resource "aws_iam_policy" "notifications_access" {
+  name = "cloud-gallery-notifications-access"
+  
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["sns:Publish", "sns:GetTopicAttributes"]
+        Resource = [for topic in aws_sns_topic.notifications : topic.arn]
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "lambda_notifications_access" {
+  role       = module.lambda_notifications.role_name
+  policy_arn = aws_iam_policy.notifications_access.arn
+}
+
 module "step_functions" {
   source = "./modules/step_functions"
   
@@ -145,8 +351,14 @@ module "step_functions" {
   environment               = var.environment
   lambda_fetch_art_arn      = module.lambda_fetch_art.function_arn
   lambda_process_store_arn  = module.lambda_process_store.function_arn
+  lambda_enrich_item_arn    = module.lambda_enrich_item.function_arn
+  lambda_store_item_arn     = module.lambda_store_item.function_arn
   lambda_generate_html_arn  = module.lambda_generate_html.function_arn
   lambda_notifications_arn  = module.lambda_notifications.function_arn
+  workflow_type             = var.workflow_type
+  map_max_concurrency       = var.map_max_concurrency
+  log_level                 = var.workflow_log_level
+  log_retention_days        = var.workflow_log_retention_days
   
   tags = {
     Component = "Orchestration"
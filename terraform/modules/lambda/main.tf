@@ -1,7 +1,7 @@
 data "archive_file" "lambda_zip" {
   type        = "zip"
   source_dir  = var.source_dir
-  output_path = "${var.source_dir}.zip"
+  output_path = "${path.root}/.build/${var.function_name}.zip"
 }
 
 resource "aws_iam_role" "lambda_role" {
@@ -35,7 +35,9 @@ resource "aws_lambda_function" "function" {
   handler         = var.handler
   runtime         = var.runtime
   timeout         = var.timeout
+  memory_size     = var.memory_size
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+  layers           = var.layers
 
   environment {
     variables = var.environment_variables
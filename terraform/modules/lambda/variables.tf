@@ -31,12 +31,24 @@ variable "timeout" {
   default     = 30
 }
 
+variable "memory_size" {
+  description = "Lambda function memory in MB"
+  type        = number
+  default     = 128
+}
+
 variable "environment_variables" {
   description = "Environment variables for the Lambda function"
   type        = map(string)
   default     = {}
 }
 
+variable "layers" {
+  description = "Lambda layer version ARNs to attach to the function"
+  type        = list(string)
+  default     = []
+}
+
 variable "tags" {
   description = "Tags to apply to resources"
   type        = map(string)
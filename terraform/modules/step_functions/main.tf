@@ -31,6 +31,8 @@ resource "aws_iam_policy" "step_functions_lambda_policy" {
         Resource = [
           var.lambda_fetch_art_arn,
           var.lambda_process_store_arn,
+          var.lambda_enrich_item_arn,
+          var.lambda_store_item_arn,
           var.lambda_generate_html_arn,
           var.lambda_notifications_arn
         ]
@@ -44,9 +46,67 @@ resource "aws_iam_role_policy_attachment" "step_functions_lambda_attach" {
   policy_arn = aws_iam_policy.step_functions_lambda_policy.arn
 }
 
+# Express workflows keep no execution history, so their failures are only
+# visible through CloudWatch Logs
+resource "aws_cloudwatch_log_group" "state_machine" {
+  count = var.workflow_type == "EXPRESS" ? 1 : 0
+
+  name              = "/aws/vendedlogs/states/${var.state_machine_name}"
+  retention_in_days = var.log_retention_days
+
+  tags = var.tags
+}
+
+resource "aws_iam_policy" "step_functions_logging_policy" {
+  count = var.workflow_type == "EXPRESS" ? 1 : 0
+
+  name = "${var.state_machine_name}-logging-policy"
+
+  # Log delivery actions don't support resource-level permissions
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogDelivery",
+          "logs:GetLogDelivery",
+          "logs:UpdateLogDelivery",
+          "logs:DeleteLogDelivery",
+          "logs:ListLogDeliveries",
+          "logs:PutResourcePolicy",
+          "logs:DescribeResourcePolicies",
+          "logs:DescribeLogGroups"
+        ]
+        Resource = "*"
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "step_functions_logging_attach" {
+  count = var.workflow_type == "EXPRESS" ? 1 : 0
+
+  role       = aws_iam_role.step_functions_role.name
+  policy_arn = aws_iam_policy.step_functions_logging_policy[0].arn
+}
+
 resource "aws_sfn_state_machine" "art_pipeline" {
   name     = var.state_machine_name
   role_arn = aws_iam_role.step_functions_role.arn
+  type     = var.workflow_type
+
+  dynamic "logging_configuration" {
+    for_each = aws_cloudwatch_log_group.state_machine
+
+    content {
+      log_destination        = "${logging_configuration.value.arn}:*"
+      include_execution_data = true
+      level                  = var.log_level
+    }
+  }
+
+  depends_on = [aws_iam_role_policy_attachment.step_functions_logging_attach]
 
   definition = jsonencode({
     Comment = "Cloud Gallery Art Pipeline - Daily artwork processing workflow"
@@ -55,7 +115,7 @@ resource "aws_sfn_state_machine" "art_pipeline" {
       FetchArtworks = {
         Type     = "Task"
         Resource = var.lambda_fetch_art_arn
-        Comment  = "Fetch 9 artworks from Art Institute API"
+        Comment  = "Fetch the daily artworks from Art Institute API"
         Retry = [
           {
             ErrorEquals = ["Lambda.ServiceException", "Lambda.AWSLambdaException", "Lambda.SdkClientException"]
@@ -81,16 +141,100 @@ resource "aws_sfn_state_machine" "art_pipeline" {
           {
             Variable      = "$.statusCode"
             NumericEquals = 200
-            Next          = "ProcessAndStore"
+            Next          = "ProcessArtworks"
           }
         ]
         Default = "HandleError"
       }
 
-      ProcessAndStore = {
+      ProcessArtworks = {
+        Type           = "Map"
+        Comment        = "Enrich and store each artwork in parallel; item failures are isolated"
+        ItemsPath      = "$.body.artworks"
+        MaxConcurrency = var.map_max_concurrency
+        ItemSelector = {
+          "artwork.$" = "$$.Map.Item.Value"
+        }
+        ItemProcessor = {
+          ProcessorConfig = {
+            Mode = "INLINE"
+          }
+          StartAt = "EnrichArtwork"
+          States = {
+            EnrichArtwork = {
+              Type     = "Task"
+              Resource = var.lambda_enrich_item_arn
+              Comment  = "Enrichment is best effort; store the artwork unenriched on failure"
+              Retry = [
+                {
+                  ErrorEquals = ["Lambda.ServiceException", "Lambda.AWSLambdaException", "Lambda.SdkClientException", "Lambda.TooManyRequestsException"]
+                  IntervalSeconds = 1
+                  MaxAttempts     = 2
+                  BackoffRate     = 2.0
+                }
+              ]
+              Catch = [
+                {
+                  ErrorEquals = ["States.ALL"]
+                  Next        = "StoreArtwork"
+                  ResultPath  = "$.enrich_error"
+                }
+              ]
+              Next = "StoreArtwork"
+            }
+
+            StoreArtwork = {
+              Type     = "Task"
+              Resource = var.lambda_store_item_arn
+              Retry = [
+                {
+                  ErrorEquals = ["Lambda.ServiceException", "Lambda.AWSLambdaException", "Lambda.SdkClientException", "Lambda.TooManyRequestsException"]
+                  IntervalSeconds = 1
+                  MaxAttempts     = 3
+                  BackoffRate     = 2.0
+                }
+              ]
+              Catch = [
+                {
+                  ErrorEquals = ["States.ALL"]
+                  Next        = "ItemFailed"
+                  ResultPath  = "$.error"
+                }
+              ]
+              End = true
+            }
+
+            ItemFailed = {
+              Type    = "Pass"
+              Comment = "Record the failure instead of failing the whole batch"
+              Parameters = {
+                "artwork.$" = "$.artwork"
+                "stored"    = false
+                "error.$"   = "$.error.Cause"
+              }
+              End = true
+            }
+          }
+        }
+        ResultPath = "$.item_results"
+        Catch = [
+          {
+            ErrorEquals = ["States.ALL"]
+            Next        = "HandleError"
+            ResultPath  = "$.error"
+          }
+        ]
+        Next = "ReduceResults"
+      }
+
+      ReduceResults = {
         Type     = "Task"
         Resource = var.lambda_process_store_arn
-        Comment  = "Process artwork data and store in DynamoDB"
+        Comment  = "Reduce per-item results into the shape GenerateHTML expects"
+        Parameters = {
+          "item_results.$" = "$.item_results"
+          "artworks.$"     = "$.body.artworks"
+        }
         Retry = [
           {
             ErrorEquals = ["Lambda.ServiceException", "Lambda.AWSLambdaException", "Lambda.SdkClientException"]
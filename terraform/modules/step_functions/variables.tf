@@ -18,6 +18,16 @@ variable "lambda_process_store_arn" {
   type        = string
 }
 
+variable "lambda_enrich_item_arn" {
+  description = "ARN of the per-artwork enrichment Lambda function"
+  type        = string
+}
+
+variable "lambda_store_item_arn" {
+  description = "ARN of the per-artwork storage Lambda function"
+  type        = string
+}
+
 variable "lambda_generate_html_arn" {
   description = "ARN of the generate HTML Lambda function"
   type        = string
@@ -28,6 +38,45 @@ variable "lambda_notifications_arn" {
   type        = string
 }
 
+variable "workflow_type" {
+  description = "Step Functions workflow type (STANDARD or EXPRESS)"
+  type        = string
+  default     = "STANDARD"
+
+  validation {
+    condition     = contains(["STANDARD", "EXPRESS"], var.workflow_type)
+    error_message = "workflow_type must be STANDARD or EXPRESS."
+  }
+}
+
+variable "map_max_concurrency" {
+  description = "Maximum artworks processed in parallel by the Map state (0 = unbounded)"
+  type        = number
+  default     = 10
+
+  validation {
+    condition     = var.map_max_concurrency >= 0 && floor(var.map_max_concurrency) == var.map_max_concurrency
+    error_message = "map_max_concurrency must be a whole number >= 0 (0 = unbounded)."
+  }
+}
+
+variable "log_level" {
+  description = "Execution log level for EXPRESS workflows (ALL, ERROR or FATAL)"
+  type        = string
+  default     = "ERROR"
+
+  validation {
+    condition     = contains(["ALL", "ERROR", "FATAL"], var.log_level)
+    error_message = "log_level must be ALL, ERROR or FATAL."
+  }
+}
+
+variable "log_retention_days" {
+  description = "Days to keep EXPRESS workflow execution logs"
+  type        = number
+  default     = 14
+}
+
 variable "tags" {
   description = "Tags to apply to resources"
   type        = map(string)
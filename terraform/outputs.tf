@@ -26,4 +26,14 @@ output "eventbridge_rule_name" {
 output "schedule_expression" {
   description = "Daily schedule expression"
   value       = module.eventbridge.schedule_expression
-}
\ No newline at end of file
+}
+
+output "notification_topic_arns" {
+  description = "ARNs of the per-digest notification SNS topics, keyed by digest"
+  value       = { for digest, topic in aws_sns_topic.notifications : digest => topic.arn }
+}
+
+output "state_bucket_name" {
+  description = "Name of the private pipeline state bucket"
+  value       = aws_s3_bucket.pipeline_state.id
+}
@@ -21,11 +21,47 @@ variable "website_bucket_name" {
   type        = string
 }
 
+variable "state_bucket_name" {
+  description = "Name of the private S3 bucket for pipeline state (defaults to <website bucket>-state)"
+  type        = string
+  default     = null
+}
+
 variable "dynamodb_table_name" {
   description = "Name of the DynamoDB table"
   type        = string
 }
 
+variable "artworks_per_day" {
+  description = "Number of artworks fetched and published per daily run"
+  type        = number
+  default     = 9
+}
+
+variable "aic_api_timeout" {
+  description = "Timeout in seconds for each Art Institute API request"
+  type        = number
+  default     = 5
+}
+
+variable "circuit_failure_threshold" {
+  description = "Consecutive API failures before the circuit breaker opens"
+  type        = number
+  default     = 3
+}
+
+variable "circuit_reset_seconds" {
+  description = "Seconds the circuit breaker stays open before a trial API call. Keep it longer than the interval between scheduled runs (the default is 25 hours for the daily schedule). Otherwise every run finds the breaker past its reset and waits out a trial call, and the persisted state never makes a run fail fast"
+  type        = number
+  default     = 90000
+}
+
+variable "reserve_days" {
+  description = "Days of not-yet-shown artworks kept in reserve for API outages"
+  type        = number
+  default     = 3
+}
+
 variable "lambda_fetch_art_name" {
   description = "Name of the fetch art Lambda function"
   type        = string
@@ -36,21 +72,92 @@ variable "lambda_process_store_name" {
   type        = string
 }
 
+variable "lambda_enrich_item_name" {
+  description = "Name of the per-artwork enrichment Lambda function"
+  type        = string
+  default     = "cloud-gallery-enrich-item"
+}
+
+variable "lambda_store_item_name" {
+  description = "Name of the per-artwork storage Lambda function"
+  type        = string
+  default     = "cloud-gallery-store-item"
+}
+
 variable "lambda_generate_html_name" {
   description = "Name of the generate HTML Lambda function"
   type        = string
 }
 
+variable "numpy_layer_arn" {
+  description = "ARN of a Lambda layer providing NumPy (e.g. AWS SDK for pandas); related artworks are skipped when empty"
+  type        = string
+  default     = ""
+}
+
+variable "s3_sync_max_workers" {
+  description = "Maximum concurrent S3 uploads when publishing the site"
+  type        = number
+  default     = 8
+}
+
+variable "delete_orphaned_site_objects" {
+  description = "Delete previously published site objects that are no longer generated. Keys are date-prefixed, so this removes earlier days' page chunks and breaks navigation in tabs still open on an earlier day. When false they are kept but no longer tracked, so enabling this later only removes objects that stop being generated afterwards"
+  type        = bool
+  default     = false
+}
+
 variable "lambda_notifications_name" {
   description = "Name of the notifications Lambda function"
   type        = string
 }
 
+variable "notification_topic_name" {
+  description = "Name prefix of the per-digest SNS topics (<name>-daily, <name>-weekly) subscribers subscribe to"
+  type        = string
+  default     = "cloud-gallery-notifications"
+}
+
+variable "weekly_digest_day" {
+  description = "Weekday weekly digests are sent on (0 = Monday)"
+  type        = number
+  default     = 0
+}
+
 variable "step_functions_name" {
   description = "Name of the Step Functions state machine"
   type        = string
 }
 
+variable "workflow_type" {
+  description = "Step Functions workflow type: STANDARD, or EXPRESS for cheaper high-volume runs"
+  type        = string
+  default     = "STANDARD"
+}
+
+variable "map_max_concurrency" {
+  description = "Maximum artworks processed in parallel by the Map state (0 = unbounded). Processing latency stays flat up to this many artworks per day and grows linearly beyond it; the bound keeps a large day from exhausting Lambda concurrency"
+  type        = number
+  default     = 10
+
+  validation {
+    condition     = var.map_max_concurrency >= 0 && floor(var.map_max_concurrency) == var.map_max_concurrency
+    error_message = "map_max_concurrency must be a whole number >= 0 (0 = unbounded)."
+  }
+}
+
+variable "workflow_log_level" {
+  description = "Execution log level for EXPRESS workflows (ALL, ERROR or FATAL); ERROR records Map item and HandleError failures"
+  type        = string
+  default     = "ERROR"
+}
+
+variable "workflow_log_retention_days" {
+  description = "Days to keep EXPRESS workflow execution logs"
+  type        = number
+  default     = 14
+}
+
 variable "eventbridge_rule_name" {
   description = "Name of the EventBridge rule"
   type        = string
@@ -0,0 +1,40 @@
+"""
+Import the Lambda sources the way the Lambda runtime sees them: the shared
+layer and each function's own directory are on the import path.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+from moto import mock_aws
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(REPO_ROOT, "src", "lambda_functions")
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "src", "layers", "shared", "python"))
+for function in sorted(os.listdir(LAMBDA_DIR)):
+    sys.path.insert(0, os.path.join(LAMBDA_DIR, function))
+
+
+def load_handler(function):
+    """Import a function's lambda_function.py under a unique module name"""
+    spec = importlib.util.spec_from_file_location(
+        f"{function}_lambda_function",
+        os.path.join(LAMBDA_DIR, function, "lambda_function.py"),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Mocked AWS with fake credentials, so nothing reaches a real account"""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    with mock_aws():
+        yield
@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+import pytest
+
+from cloud_gallery.artwork import DEFAULT_ARTIST, DEFAULT_DATE, DEFAULT_TITLE, Artwork
+
+FETCHED_AT = "2026-10-19T06:00:00"
+
+API_RECORD = {
+    "id": 27992,
+    "title": "  A Sunday on La Grande Jatte  ",
+    "artist_display": "Georges Seurat",
+    "date_display": "1884-86",
+    "image_id": "2d484387-2509-5e8e-2c43-22f9981972eb",
+    "color": {"h": 44, "l": 53, "s": 21, "percentage": 0.4},
+    "artwork_type_id": 1,
+    "department_id": "PC-10",
+    "classification_id": None,
+    "style_id": "TM-7543",
+}
+
+
+def test_round_trip_through_every_shape():
+    artwork = Artwork.from_api(API_RECORD, FETCHED_AT)
+    assert artwork.artwork_id == "27992"
+    assert artwork.title == "A Sunday on La Grande Jatte"
+    assert artwork.color == {"h": 44, "l": 53, "s": 21}
+    assert artwork.taxonomy == {
+        "artwork_type_id": "1",
+        "department_id": "PC-10",
+        "style_id": "TM-7543",
+    }
+
+    payload = artwork.to_payload()
+    assert payload["date"] == "1884-86"
+    assert Artwork.from_payload(payload) == artwork
+
+    item = artwork.to_dynamodb_item("2026-10-19")
+    assert item["date_display"] == "1884-86"
+    assert "date" not in item
+    assert (item["date_fetched"], item["status"]) == ("2026-10-19", "active")
+    assert Artwork.from_dynamodb_item(item) == artwork
+
+
+def test_dynamodb_decimals_are_converted():
+    item = Artwork.from_api(API_RECORD, FETCHED_AT).to_dynamodb_item("2026-10-19")
+    item["color"] = {key: Decimal(value) for key, value in item["color"].items()}
+
+    color = Artwork.from_dynamodb_item(item).color
+    assert color == {"h": 44, "l": 53, "s": 21}
+    assert all(type(value) is int for value in color.values())
+
+
+@pytest.mark.parametrize("title", [None, "", "   ", "X"])
+def test_short_or_missing_titles_become_untitled(title):
+    assert Artwork("1", title).title == DEFAULT_TITLE
+
+
+def test_blank_fields_fall_back_to_defaults():
+    artwork = Artwork("1", "Study", artist="  ", date="", image_id="", color={"h": 1})
+
+    assert (artwork.artist, artwork.date) == (DEFAULT_ARTIST, DEFAULT_DATE)
+    assert artwork.image_id is None
+    assert artwork.color is None
+    assert "image_id" not in artwork.to_dynamodb_item("2026-10-19")
+
+
+@pytest.mark.parametrize("artwork_id", [None, "", "  "])
+def test_missing_id_is_rejected(artwork_id):
+    with pytest.raises(ValueError):
+        Artwork(artwork_id, "Study")
+
+
+@pytest.mark.parametrize("record", [{"title": "Study"}, {"id": 1}, {"id": 1, "title": ""}])
+def test_unusable_api_records_are_rejected(record):
+    with pytest.raises(ValueError):
+        Artwork.from_api(record, FETCHED_AT)
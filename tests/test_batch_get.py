@@ -0,0 +1,69 @@
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+
+from cloud_gallery.batch_get import batch_get_artworks
+
+TABLE = "artworks"
+
+
+@pytest.fixture
+def dynamodb(aws):
+    resource = boto3.resource("dynamodb")
+    table = resource.create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "artwork_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "artwork_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    with table.batch_writer() as batch:
+        for i in range(0, 250, 2):
+            batch.put_item(Item={"artwork_id": str(i), "title": f"Artwork {i}"})
+    return resource
+
+
+def throttled_first(dynamodb, times=1):
+    """Report every key of the first requests as unprocessed, like a throttled table"""
+    real = dynamodb.batch_get_item
+    calls = []
+
+    def call(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) <= times:
+            return {"Responses": {TABLE: []}, "UnprocessedKeys": RequestItems}
+        return real(RequestItems=RequestItems)
+
+    return mock.patch.object(dynamodb, "batch_get_item", side_effect=call), calls
+
+
+def test_reads_stored_items_in_batches_of_100(dynamodb):
+    with mock.patch.object(
+        dynamodb, "batch_get_item", wraps=dynamodb.batch_get_item
+    ) as batch_get_item:
+        items = batch_get_artworks(dynamodb, TABLE, range(250), projection="artwork_id")
+
+    assert batch_get_item.call_count == 3
+    assert set(items) == {str(i) for i in range(0, 250, 2)}
+    assert items["4"] == {"artwork_id": "4"}
+
+
+def test_unprocessed_keys_are_retried_with_backoff(dynamodb):
+    sleeps = []
+    patch, calls = throttled_first(dynamodb, times=2)
+
+    with patch:
+        items = batch_get_artworks(dynamodb, TABLE, ["2", "3", "4"], sleep=sleeps.append)
+
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert set(items) == {"2", "4"}
+
+
+def test_gives_up_when_keys_stay_unprocessed(dynamodb):
+    patch, calls = throttled_first(dynamodb, times=10)
+
+    with patch, pytest.raises(RuntimeError):
+        batch_get_artworks(dynamodb, TABLE, ["2"], max_attempts=3, sleep=lambda s: None)
+
+    assert len(calls) == 3
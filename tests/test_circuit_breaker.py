@@ -0,0 +1,134 @@
+import pytest
+
+from cloud_gallery.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class MemoryStore:
+    """State store shared by breakers, like consecutive Lambda invocations"""
+
+    def __init__(self):
+        self.state = None
+        self.saves = 0
+
+    def load(self):
+        return dict(self.state) if self.state else None
+
+    def save(self, state):
+        self.state = dict(state)
+        self.saves += 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing():
+    raise TimeoutError("upstream timed out")
+
+
+def succeeding():
+    return "ok"
+
+
+@pytest.fixture
+def store():
+    return MemoryStore()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def invocation(store, clock, **kwargs):
+    """A fresh breaker per call, as each Lambda invocation builds its own"""
+    return CircuitBreaker("api", store, failure_threshold=3, reset_timeout=60, clock=clock, **kwargs)
+
+
+def fail(breaker):
+    with pytest.raises(TimeoutError):
+        breaker.call(failing)
+
+
+def test_opens_after_threshold_and_fails_fast(store, clock):
+    for _ in range(2):
+        fail(invocation(store, clock))
+    assert store.state["state"] == CLOSED
+    assert store.state["failures"] == 2
+
+    fail(invocation(store, clock))
+    assert store.state["state"] == OPEN
+    assert store.state["opened_at"] == clock.now
+
+    calls = []
+    clock.now += 59
+    with pytest.raises(CircuitOpenError):
+        invocation(store, clock).call(lambda: calls.append("called"))
+    assert calls == []
+
+
+def test_half_open_trial_success_closes(store, clock):
+    for _ in range(3):
+        fail(invocation(store, clock))
+
+    clock.now += 60
+    breaker = invocation(store, clock)
+    assert breaker.allow_request()
+    assert breaker.state["state"] == HALF_OPEN
+
+    assert breaker.call(succeeding) == "ok"
+    assert store.state == {"state": CLOSED, "failures": 0, "opened_at": None}
+    assert invocation(store, clock).call(succeeding) == "ok"
+
+
+def test_half_open_trial_failure_reopens(store, clock):
+    for _ in range(3):
+        fail(invocation(store, clock))
+
+    clock.now += 60
+    fail(invocation(store, clock))
+    assert store.state["state"] == OPEN
+    assert store.state["opened_at"] == clock.now
+
+    # The reset window restarts from the failed trial
+    clock.now += 30
+    with pytest.raises(CircuitOpenError):
+        invocation(store, clock).call(succeeding)
+
+
+def test_success_resets_failure_count(store, clock):
+    fail(invocation(store, clock))
+    invocation(store, clock).call(succeeding)
+    assert store.state["failures"] == 0
+
+    saves = store.saves
+    invocation(store, clock).call(succeeding)
+    # Nothing changed, so nothing is written
+    assert store.saves == saves
+
+
+def test_ignored_errors_do_not_count(store, clock):
+    breaker = invocation(store, clock, is_failure=lambda error: False)
+    for _ in range(5):
+        with pytest.raises(TimeoutError):
+            breaker.call(failing)
+    assert store.state is None
+
+
+def test_unreadable_store_starts_closed(clock):
+    class BrokenStore(MemoryStore):
+        def load(self):
+            raise OSError("no access")
+
+    breaker = invocation(BrokenStore(), clock)
+    assert breaker.call(succeeding) == "ok"
@@ -0,0 +1,178 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+from botocore.exceptions import (  # type: ignore
+    ClientError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from conftest import load_handler
+from dispatcher import DIGEST_DAILY, DIGEST_WEEKLY, NotificationDispatcher, select_digests
+
+MONDAY = datetime(2026, 10, 19)
+TUESDAY = datetime(2026, 10, 20)
+
+MESSAGES = {DIGEST_DAILY: "daily body", DIGEST_WEEKLY: "weekly body"}
+SUBJECTS = {DIGEST_DAILY: "Daily", DIGEST_WEEKLY: "Weekly"}
+
+
+def no_sleep(seconds):
+    pass
+
+
+@pytest.fixture
+def topics(aws):
+    sns = boto3.client("sns")
+    return {
+        digest: sns.create_topic(Name=f"gallery-{digest}")["TopicArn"]
+        for digest in (DIGEST_DAILY, DIGEST_WEEKLY)
+    }
+
+
+def subscribe_queue(topic_arn, name):
+    sqs = boto3.client("sqs")
+    queue_url = sqs.create_queue(QueueName=name)["QueueUrl"]
+    queue_arn = sqs.get_queue_attributes(
+        QueueUrl=queue_url, AttributeNames=["QueueArn"]
+    )["Attributes"]["QueueArn"]
+    boto3.client("sns").subscribe(
+        TopicArn=topic_arn,
+        Protocol="sqs",
+        Endpoint=queue_arn,
+        Attributes={"RawMessageDelivery": "true"},
+    )
+    return queue_url
+
+
+def received(queue_url):
+    response = boto3.client("sqs").receive_message(
+        QueueUrl=queue_url, MaxNumberOfMessages=10
+    )
+    return [message["Body"] for message in response.get("Messages", [])]
+
+
+def test_weekly_digest_only_on_its_day():
+    assert select_digests(MONDAY, 0) == [DIGEST_DAILY, DIGEST_WEEKLY]
+    assert select_digests(TUESDAY, 0) == [DIGEST_DAILY]
+
+
+def test_each_subscriber_receives_only_its_digest_once(topics):
+    sns = boto3.client("sns")
+    # moto only delivers to the first 100 subscriptions of a topic, so the
+    # observed queues subscribe before the bulk of the subscribers
+    daily_queues = [subscribe_queue(topics[DIGEST_DAILY], f"daily-{i}") for i in range(3)]
+    weekly_queue = subscribe_queue(topics[DIGEST_WEEKLY], "weekly-0")
+    for i in range(1234):
+        digest = DIGEST_WEEKLY if i % 3 == 0 else DIGEST_DAILY
+        sns.subscribe(TopicArn=topics[digest], Protocol="sms", Endpoint=f"+1555{i:07d}")
+
+    dispatcher = NotificationDispatcher(sns, sleep=no_sleep)
+    with mock.patch.object(sns, "publish", wraps=sns.publish) as publish:
+        stats = dispatcher.dispatch(select_digests(MONDAY, 0), topics, MESSAGES, SUBJECTS)
+
+    # One call per digest topic, however many subscribers there are
+    assert publish.call_count == 2
+    assert stats["published"] == 2
+    assert stats["failed"] == 0
+    assert set(stats["digests"]) == {DIGEST_DAILY, DIGEST_WEEKLY}
+    assert all(d["latency_seconds"] >= 0 for d in stats["digests"].values())
+    for queue_url in daily_queues:
+        assert received(queue_url) == ["daily body"]
+    assert received(weekly_queue) == ["weekly body"]
+
+
+def test_digests_without_a_topic_are_skipped(topics):
+    sns = boto3.client("sns")
+    with mock.patch.object(sns, "publish", wraps=sns.publish) as publish:
+        stats = NotificationDispatcher(sns, sleep=no_sleep).dispatch(
+            [DIGEST_DAILY, DIGEST_WEEKLY],
+            {DIGEST_DAILY: topics[DIGEST_DAILY]},
+            MESSAGES,
+            SUBJECTS,
+        )
+
+    assert publish.call_args.kwargs["TopicArn"] == topics[DIGEST_DAILY]
+    assert list(stats["digests"]) == [DIGEST_DAILY]
+
+
+def test_transport_errors_are_retried(topics):
+    sns = boto3.client("sns")
+    queue_url = subscribe_queue(topics[DIGEST_DAILY], "daily-retry")
+    real_publish = sns.publish
+
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise EndpointConnectionError(endpoint_url="https://sns")
+        return real_publish(**kwargs)
+
+    dispatcher = NotificationDispatcher(sns, sleep=no_sleep)
+    with mock.patch.object(sns, "publish", side_effect=flaky):
+        stats = dispatcher.dispatch([DIGEST_DAILY], topics, MESSAGES, SUBJECTS)
+
+    assert len(calls) == 2
+    assert stats["published"] == 1
+    assert stats["retried"] == 1
+    assert stats["failed"] == 0
+    assert received(queue_url) == ["daily body"]
+
+
+def test_non_retryable_errors_fail_without_retrying(topics):
+    sns = boto3.client("sns")
+    error = ClientError({"Error": {"Code": "AuthorizationError", "Message": "denied"}}, "Publish")
+
+    dispatcher = NotificationDispatcher(sns, sleep=no_sleep)
+    with mock.patch.object(sns, "publish", side_effect=error) as publish:
+        stats = dispatcher.dispatch([DIGEST_DAILY], topics, MESSAGES, SUBJECTS)
+
+    assert publish.call_count == 1
+    assert stats["failed"] == 1
+    assert stats["errors"] == ["daily: AuthorizationError: denied"]
+
+
+def test_failed_digest_is_reported_and_others_still_dispatched(topics):
+    sns = boto3.client("sns")
+    weekly_queue = subscribe_queue(topics[DIGEST_WEEKLY], "weekly-ok")
+    real_publish = sns.publish
+
+    def daily_times_out(**kwargs):
+        if kwargs["TopicArn"] == topics[DIGEST_DAILY]:
+            raise ReadTimeoutError(endpoint_url="https://sns")
+        return real_publish(**kwargs)
+
+    dispatcher = NotificationDispatcher(sns, max_attempts=3, sleep=no_sleep)
+    with mock.patch.object(sns, "publish", side_effect=daily_times_out):
+        stats = dispatcher.dispatch(select_digests(MONDAY, 0), topics, MESSAGES, SUBJECTS)
+
+    assert stats["published"] == 1
+    assert stats["failed"] == 1
+    assert stats["retried"] == 2
+    assert stats["errors"][0].startswith("daily: ReadTimeoutError")
+    assert stats["digests"][DIGEST_DAILY]["published"] is False
+    assert received(weekly_queue) == ["weekly body"]
+
+
+def test_handler_reports_subscribers_and_latency(topics, monkeypatch):
+    monkeypatch.setenv("DAILY_DIGEST_TOPIC_ARN", topics[DIGEST_DAILY])
+    monkeypatch.setenv("WEEKLY_DIGEST_TOPIC_ARN", topics[DIGEST_WEEKLY])
+    queue_url = subscribe_queue(topics[DIGEST_DAILY], "daily-handler")
+    notifications = load_handler("notifications")
+
+    response = notifications.lambda_handler(
+        {"body": {"artworks_count": 9, "url": "https://gallery.example"}}, None
+    )
+
+    notification = response["body"]["notification"]
+    assert response["statusCode"] == 200
+    assert notification["notification_sent"] is True
+    assert notification["dispatch"]["failed"] == 0
+    assert "latency_seconds" in notification["dispatch"]["digests"][DIGEST_DAILY]
+    assert "subscribers" in notification["dispatch"]
+    assert "9 new pieces" in received(queue_url)[0]
+    assert json.dumps(notification)
@@ -0,0 +1,100 @@
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+
+from cloud_gallery.artwork import Artwork
+from conftest import load_handler
+
+TABLE = "artworks"
+
+
+@pytest.fixture
+def generate_html(aws):
+    return load_handler("generate_html")
+
+
+@pytest.fixture
+def table(aws):
+    return boto3.resource("dynamodb").create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "artwork_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "artwork_id", "AttributeType": "S"},
+            {"AttributeName": "date_fetched", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "DateIndex",
+                "KeySchema": [{"AttributeName": "date_fetched", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def artworks(count):
+    return [Artwork(str(i), f"Artwork {i}", image_id=f"img-{i}") for i in range(count)]
+
+
+@pytest.mark.parametrize(
+    "count, page_size, page_lengths",
+    [
+        (1, 3, [1]),
+        (9, 3, [3, 3, 3]),
+        (10, 4, [4, 4, 2]),
+        (200, 12, [12] * 16 + [8]),
+    ],
+)
+def test_pagination(generate_html, count, page_size, page_lengths):
+    assert generate_html.get_page_size(count) == page_size
+
+    pages = generate_html.paginate_artworks(artworks(count))
+    assert [len(page) for page in pages] == page_lengths
+
+    # The first page is inlined, every later page becomes a chunk
+    chunks = generate_html.generate_page_chunks(pages)
+    assert sorted(chunks) == list(range(2, len(pages) + 1))
+    for page_number, body in chunks.items():
+        chunk = json.loads(body)
+        assert chunk["page"] == page_number
+        assert [card["artwork_id"] for card in chunk["artworks"]] == [
+            a.artwork_id for a in pages[page_number - 1]
+        ]
+
+
+def test_no_artworks_is_one_empty_page(generate_html):
+    assert generate_html.get_page_size(0) == 3
+    assert generate_html.paginate_artworks([]) == [[]]
+    assert generate_html.generate_page_chunks([[]]) == {}
+
+
+def test_latest_artworks_are_queried_from_the_date_index(generate_html, table):
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    yesterday = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
+    with table.batch_writer() as batch:
+        for artwork in artworks(5):
+            batch.put_item(Item=artwork.to_dynamodb_item(today))
+        batch.put_item(Item=Artwork("old", "Old artwork").to_dynamodb_item(yesterday))
+        batch.put_item(
+            Item=Artwork("hidden", "Hidden artwork").to_dynamodb_item(today, status="inactive")
+        )
+
+    real_table = generate_html.dynamodb.Table(TABLE)
+    real_query = real_table.query
+
+    # Small query pages, so the result has to be followed across LastEvaluatedKey
+    def query(**kwargs):
+        return real_query(Limit=2, **kwargs)
+
+    with mock.patch.object(real_table, "query", side_effect=query) as paged, mock.patch.object(
+        real_table, "scan", side_effect=AssertionError("the archive must not be scanned")
+    ), mock.patch.object(generate_html.dynamodb, "Table", return_value=real_table):
+        latest = generate_html.get_latest_artworks_from_dynamodb(TABLE)
+
+    assert sorted(a.artwork_id for a in latest) == ["0", "1", "2", "3", "4"]
+    assert paged.call_count > 1
+    assert all(call.kwargs["IndexName"] == "DateIndex" for call in paged.call_args_list)
@@ -0,0 +1,112 @@
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+
+from cloud_gallery.artwork import Artwork
+from conftest import load_handler
+
+TABLE = "artworks"
+
+
+@pytest.fixture
+def process_store(aws, monkeypatch):
+    monkeypatch.setenv("DYNAMODB_TABLE_NAME", TABLE)
+    return load_handler("process_store")
+
+
+@pytest.fixture
+def table(aws):
+    return boto3.resource("dynamodb").create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "artwork_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "artwork_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def payload(artwork_id, image_id=None):
+    return Artwork(artwork_id, f"Artwork {artwork_id}", image_id=image_id).to_payload()
+
+
+def stored(artwork_id):
+    return {"artwork_id": artwork_id, "stored": True}
+
+
+def item_failed(artwork_id):
+    # The ItemFailed Pass state keeps the input artwork alongside the error
+    return {"artwork": payload(artwork_id), "stored": False, "error": "Throttled"}
+
+
+def test_enrich_drops_unavailable_images(process_store):
+    with mock.patch.object(process_store, "check_image_available", return_value=False):
+        result = process_store.enrich_item_handler({"artwork": payload("1", "img")}, None)
+    assert result["artwork"]["image_id"] is None
+
+    # An inconclusive check keeps the image
+    with mock.patch.object(process_store, "check_image_available", return_value=None):
+        result = process_store.enrich_item_handler({"artwork": payload("1", "img")}, None)
+    assert result["artwork"]["image_id"] == "img"
+
+
+def test_enrich_rejects_invalid_items(process_store):
+    with pytest.raises(ValueError):
+        process_store.enrich_item_handler({"artwork": {"title": "No id"}}, None)
+
+
+def test_store_item_returns_only_the_id(process_store, table):
+    result = process_store.store_item_handler({"artwork": payload("7", "img")}, None)
+
+    assert result == {"artwork_id": "7", "stored": True}
+    item = table.get_item(Key={"artwork_id": "7"})["Item"]
+    assert (item["title"], item["image_id"], item["status"]) == ("Artwork 7", "img", "active")
+
+
+def test_store_item_errors_propagate(process_store):
+    # No table: the error reaches Step Functions for retry and isolation
+    with pytest.raises(Exception):
+        process_store.store_item_handler({"artwork": payload("7")}, None)
+
+
+def test_reduce_all_stored(process_store):
+    artworks = [payload("1"), payload("2")]
+    response = process_store.reduce_handler(
+        {"item_results": [stored("1"), stored("2")], "artworks": artworks}, None
+    )
+
+    assert response["statusCode"] == 200
+    assert response["body"]["stored_count"] == 2
+    assert response["body"]["artworks"] == artworks
+
+
+def test_reduce_partial_failure(process_store):
+    artworks = [payload("1"), payload("2"), payload("3")]
+    response = process_store.reduce_handler(
+        {"item_results": [stored("1"), item_failed("2"), stored("3")], "artworks": artworks},
+        None,
+    )
+
+    body = response["body"]
+    assert response["statusCode"] == 207
+    assert (body["stored_count"], body["total_artworks"]) == (2, 3)
+    assert body["errors"] == ["Failed to store artwork 2: Throttled"]
+    assert [a["artwork_id"] for a in body["artworks"]] == ["1", "3"]
+
+
+def test_reduce_nothing_stored(process_store):
+    response = process_store.reduce_handler(
+        {"item_results": [item_failed("1")], "artworks": [payload("1")]}, None
+    )
+
+    assert response["statusCode"] == 500
+    assert response["body"]["stored_count"] == 0
+    assert response["body"]["artworks"] == []
+
+
+@pytest.mark.parametrize("event", [{"item_results": [], "artworks": []}, {}])
+def test_reduce_empty_map_result(process_store, event):
+    response = process_store.reduce_handler(event, None)
+
+    assert response["statusCode"] == 200
+    assert response["body"]["stored_count"] == 0
+    assert response["body"]["artworks"] == []
@@ -0,0 +1,127 @@
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+from botocore.exceptions import ClientError  # type: ignore
+
+from publisher import S3Publisher, SiteObject
+
+BUCKET = "gallery"
+
+
+@pytest.fixture
+def s3(aws):
+    client = boto3.client("s3")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+
+def site(chunk="chunk", related="{}", index="<html></html>"):
+    return [
+        SiteObject("pages/2026-10-19/2.json", chunk, "application/json"),
+        SiteObject("related/2026-10-19.json", related, "application/json", required=False),
+        SiteObject("index.html", index, "text/html", deferred=True),
+    ]
+
+
+def keys(s3):
+    return {obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET).get("Contents", [])}
+
+
+def failing(s3, method, failing_key=None):
+    """Patch an S3 method to fail, for one key or for every call"""
+    real = getattr(s3, method)
+    error = ClientError({"Error": {"Code": "InternalError", "Message": "boom"}}, method)
+
+    def call(**kwargs):
+        if failing_key is None or kwargs.get("Key") == failing_key:
+            raise error
+        return real(**kwargs)
+
+    return mock.patch.object(s3, method, side_effect=call)
+
+
+def test_unchanged_objects_are_skipped(s3):
+    publisher = S3Publisher(s3, BUCKET)
+
+    first = publisher.publish(site())
+    second = publisher.publish(site())
+    third = publisher.publish(site(chunk="changed"))
+
+    assert (first["uploaded"], first["skipped"]) == (3, 0)
+    assert (second["uploaded"], second["skipped"]) == (0, 3)
+    assert (third["uploaded"], third["skipped"]) == (1, 2)
+
+
+def test_index_is_not_published_after_a_required_failure(s3):
+    publisher = S3Publisher(s3, BUCKET)
+
+    with failing(s3, "put_object", "pages/2026-10-19/2.json"):
+        summary = publisher.publish(site())
+
+    assert summary["failed"] == 2
+    assert "index.html: skipped after earlier failures" in summary["errors"]
+    assert "index.html" not in keys(s3)
+
+    # Nothing was recorded for the failed keys, so the next run retries them
+    retry = publisher.publish(site())
+    assert retry["failed"] == 0
+    assert {"pages/2026-10-19/2.json", "index.html"} <= keys(s3)
+
+
+def test_optional_failure_does_not_block_the_index(s3):
+    publisher = S3Publisher(s3, BUCKET)
+
+    with failing(s3, "put_object", "related/2026-10-19.json"):
+        summary = publisher.publish(site())
+
+    assert summary["failed"] == 0
+    assert summary["optional_failed"] == 1
+    assert "index.html" in keys(s3)
+    assert "related/2026-10-19.json" not in keys(s3)
+
+
+def test_orphans_are_deleted_only_when_asked(s3):
+    publisher = S3Publisher(s3, BUCKET)
+    s3.put_object(Bucket=BUCKET, Key="uploads/manual.txt", Body=b"untracked")
+    publisher.publish(site())
+    day_two = [
+        SiteObject("pages/2026-10-20/2.json", "chunk", "application/json"),
+        SiteObject("index.html", "<html>new</html>", "text/html", deferred=True),
+    ]
+
+    deleted = publisher.publish(day_two, delete_orphans=True)
+    assert deleted["deleted"] == 2
+    assert keys(s3) == {
+        ".publish-manifest.json",
+        "index.html",
+        "pages/2026-10-20/2.json",
+        "uploads/manual.txt",
+    }
+
+    # Kept orphans stay in the bucket but leave the manifest, so it doesn't grow
+    kept = publisher.publish(day_two[1:])
+    assert kept["deleted"] == 0
+    assert "pages/2026-10-20/2.json" in keys(s3)
+    assert set(publisher.load_manifest()) == {"index.html"}
+
+    later = publisher.publish(day_two[1:], delete_orphans=True)
+    assert later["deleted"] == 0
+    assert "pages/2026-10-20/2.json" in keys(s3)
+
+
+def test_delete_failures_are_reported_without_failing(s3):
+    publisher = S3Publisher(s3, BUCKET)
+    publisher.publish(site())
+
+    with failing(s3, "delete_objects"):
+        summary = publisher.publish(site()[2:], delete_orphans=True)
+
+    assert summary["failed"] == 0
+    assert summary["delete_failed"] == 2
+    assert "pages/2026-10-19/2.json" in keys(s3)
+
+    # Failed deletes stay tracked and are retried
+    retry = publisher.publish(site()[2:], delete_orphans=True)
+    assert retry["deleted"] == 2
+    assert "pages/2026-10-19/2.json" not in keys(s3)
@@ -0,0 +1,99 @@
+import tempfile
+from unittest import mock
+
+import boto3  # type: ignore
+import numpy as np  # type: ignore
+import pytest
+from botocore.exceptions import ClientError  # type: ignore
+
+from cloud_gallery.artwork import Artwork
+from recommendations import INDEX_PREFIX, compute_related_ids, load_index, top_k_similar
+
+BUCKET = "state"
+
+
+def unit_rows(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_queries_are_never_each_others_neighbours():
+    # Rows 0 and 1 are near-identical, so each would be the other's best match
+    features = unit_rows([[1, 0, 0], [1, 0.01, 0], [1, 0.2, 0], [0.5, 1, 0], [0, 0, 1]])
+    query_rows = np.array([0, 1], dtype=np.int64)
+
+    rows, _ = top_k_similar(features, query_rows, k=2, block_size=2)
+
+    assert rows.tolist() == [[2, 3], [2, 3]]
+
+
+def test_missing_neighbours_are_marked():
+    features = unit_rows([[1, 0, 0], [1, 0.1, 0], [0, 0, 1]])
+
+    rows, _ = top_k_similar(features, np.array([0, 1], dtype=np.int64), k=1)
+
+    # Row 2 is orthogonal to both queries, so there is no related artwork
+    assert rows.tolist() == [[-1], [-1]]
+
+
+def artwork(artwork_id, hue):
+    return Artwork(artwork_id, f"Artwork {artwork_id}", color={"h": hue, "l": 50, "s": 80})
+
+
+def indexed_ids(s3):
+    with tempfile.TemporaryDirectory() as work_dir:
+        _, ids, _ = load_index(s3, BUCKET, work_dir)
+        return [str(i) for i in ids]
+
+
+def index_keys(s3):
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=INDEX_PREFIX)
+    return {obj["Key"] for obj in response.get("Contents", [])}
+
+
+@pytest.fixture
+def s3(aws):
+    client = boto3.client("s3")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+
+def test_first_run_creates_the_index_and_relates_only_to_the_archive(s3):
+    archive = [artwork(str(i), 10 * i) for i in range(1, 6)]
+    assert compute_related_ids(s3, BUCKET, archive) == {a.artwork_id: [] for a in archive}
+    assert indexed_ids(s3) == ["1", "2", "3", "4", "5"]
+
+    today = [artwork("100", 12), artwork("101", 14)]
+    related = compute_related_ids(s3, BUCKET, today, k=3)
+
+    for artwork_id in ("100", "101"):
+        assert len(related[artwork_id]) == 3
+        assert not {"100", "101"} & set(related[artwork_id])
+
+    # Only the pointer and the current version are kept
+    assert len(index_keys(s3)) == 3
+
+
+def test_failed_upload_keeps_the_previous_index(s3):
+    compute_related_ids(s3, BUCKET, [artwork(str(i), 10 * i) for i in range(1, 6)])
+    before = index_keys(s3)
+
+    real_upload = s3.upload_file
+    error = ClientError({"Error": {"Code": "InternalError", "Message": "boom"}}, "PutObject")
+
+    def ids_upload_fails(path, bucket, key, **kwargs):
+        if key.endswith("ids.npy"):
+            raise error
+        return real_upload(path, bucket, key, **kwargs)
+
+    with mock.patch.object(s3, "upload_file", side_effect=ids_upload_fails):
+        with pytest.raises(ClientError):
+            compute_related_ids(s3, BUCKET, [artwork("100", 12)])
+
+    # The new features were uploaded, but nothing points at them
+    assert indexed_ids(s3) == ["1", "2", "3", "4", "5"]
+    assert before < index_keys(s3)
+
+    related = compute_related_ids(s3, BUCKET, [artwork("100", 12)], k=2)
+    assert len(related["100"]) == 2
+    assert indexed_ids(s3) == ["1", "2", "3", "4", "5", "100"]
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+from unittest import mock
+
+import boto3  # type: ignore
+import pytest
+
+from conftest import REPO_ROOT, load_handler
+from reserve import RESERVE_KEY, ArtworkReserve
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "tools"))
+
+import aic_standin  # noqa: E402
+
+BUCKET = "state"
+TABLE = "artworks"
+
+
+@pytest.fixture
+def s3(aws):
+    client = boto3.client("s3")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+
+@pytest.fixture
+def table(aws):
+    return boto3.resource("dynamodb").create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "artwork_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "artwork_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def record(artwork_id):
+    return {"id": artwork_id, "title": f"Artwork {artwork_id}"}
+
+
+def stored_reserve(s3):
+    body = s3.get_object(Bucket=BUCKET, Key=RESERVE_KEY)["Body"].read()
+    return [r["id"] for r in json.loads(body)]
+
+
+def test_replenish_skips_todays_and_already_shown_artworks(s3):
+    reserve = ArtworkReserve(s3, BUCKET, shown_ids=lambda ids: {i for i in ids if i in (3, 4)})
+    reserve.save([record(1), record(2)])
+
+    with mock.patch.object(s3, "get_object", wraps=s3.get_object) as get_object:
+        added = reserve.replenish(
+            lambda: [record(i) for i in range(1, 9)], exclude_ids=[2, 5], target=4
+        )
+
+    # 2 is shown today and dropped; 3 and 4 were shown before; 5 is today's
+    assert added == 3
+    assert stored_reserve(s3) == [1, 6, 7, 8]
+    assert get_object.call_count == 1
+
+
+def test_replenish_does_not_fetch_when_full(s3):
+    reserve = ArtworkReserve(s3, BUCKET)
+    reserve.save([record(1), record(2)])
+
+    def fetch():
+        raise AssertionError("reserve is full, nothing to fetch")
+
+    assert reserve.replenish(fetch, exclude_ids=[], target=2) == 0
+
+
+def test_take_removes_served_artworks(s3):
+    reserve = ArtworkReserve(s3, BUCKET)
+    reserve.save([record(i) for i in range(1, 6)])
+
+    assert [r["id"] for r in reserve.take(3)] == [1, 2, 3]
+    assert stored_reserve(s3) == [4, 5]
+
+
+def test_healthy_run_replenishes_without_extra_total_count_call(s3, table, monkeypatch):
+    artworks = aic_standin.synthesize_artworks(300)
+    server = aic_standin.create_server(
+        "127.0.0.1", 0, artworks, faults=aic_standin.FaultConfig(lambda: 0.0)
+    )
+    base_url = aic_standin.start_in_background(server)
+
+    # Two in three synthetic artworks have been shown before
+    unshown = {a["id"] for a in artworks[::3]}
+    with table.batch_writer() as batch:
+        for artwork in artworks:
+            if artwork["id"] not in unshown:
+                batch.put_item(Item={"artwork_id": str(artwork["id"])})
+
+    monkeypatch.setenv("AIC_API_BASE_URL", base_url)
+    monkeypatch.setenv("STATE_BUCKET_NAME", BUCKET)
+    monkeypatch.setenv("DYNAMODB_TABLE_NAME", TABLE)
+    monkeypatch.setenv("ARTWORKS_PER_DAY", "3")
+    try:
+        response = load_handler("fetch_art").lambda_handler({}, None)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response["statusCode"] == 200
+    assert response["body"]["source"] == "api"
+    # Total count, today's page and one reserve page
+    assert server.faults.stats["requests"] == 3
+
+    shown_today = {int(a["artwork_id"]) for a in response["body"]["artworks"]}
+    reserved = stored_reserve(s3)
+    assert len(reserved) == 9
+    assert set(reserved) <= unshown - shown_today
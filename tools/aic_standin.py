@@ -0,0 +1,420 @@
+"""
+Local stand-in for the Art Institute of Chicago API.
+
+Replays recorded /api/v1/artworks responses (with pagination and field
+projection) and serves IIIF images, with configurable latency and fault
+injection for load testing and reproducing upstream failures offline.
+
+Record a collection from the live API:
+    python tools/aic_standin.py record --out recordings/artworks.json --pages 20
+
+Serve it (point fetch_art at it with AIC_API_BASE_URL=http://127.0.0.1:8080/api/v1):
+    python tools/aic_standin.py serve --recording recordings/artworks.json \\
+        --latency lognormal:4,0.5 --rate-429 0.05 --rate-5xx 0.02 --rate-reset 0.01
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import random
+import socket
+import struct
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("aic_standin")
+
+LIVE_API_URL = "https://api.artic.edu/api/v1/artworks"
+RECORD_FIELDS = (
+    "id,title,artist_display,date_display,image_id,color,"
+    "artwork_type_id,department_id,classification_id,style_id"
+)
+
+# The live API rejects requests past this many results
+MAX_RESULT_WINDOW = 10000
+# Same as fetch_art's fallback when the total-count call fails; offsets wrap
+# around the collection, so every offset below it returns artworks
+DEFAULT_TOTAL = MAX_RESULT_WINDOW
+MAX_LIMIT = 100
+
+# Private generator; fetch_art reseeds the global one on every invocation
+rng = random.Random()
+
+# 1x1 transparent GIF served when no recorded image exists
+PLACEHOLDER_IMAGE = base64.b64decode(
+    "R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+)
+
+
+def parse_latency(spec):
+    """Parse a latency spec into a sampler returning seconds.
+
+    Supported forms (values in milliseconds):
+        none, fixed:MS, uniform:LOW,HIGH, exponential:MEAN,
+        lognormal:MU,SIGMA (parameters of the underlying normal, in log-ms)
+    """
+    if not spec or spec == "none":
+        return lambda: 0.0
+
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1]) / 1000
+    if kind == "exponential" and len(values) == 1:
+        return lambda: rng.expovariate(1 / values[0]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: rng.lognormvariate(values[0], values[1]) / 1000
+
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def synthesize_artworks(count):
+    """Generate a deterministic collection when no recording is available"""
+    seeded = random.Random(count)
+    return [
+        {
+            "id": 100000 + i,
+            "title": f"Stand-in Artwork {i}",
+            "artist_display": f"Stand-in Artist {seeded.randint(1, 500)}",
+            "date_display": str(seeded.randint(1400, 2020)),
+            "image_id": f"standin-{i:05d}" if seeded.random() > 0.1 else None,
+            "color": {
+                "h": seeded.randint(0, 359),
+                "l": seeded.randint(10, 90),
+                "s": seeded.randint(0, 100),
+                "percentage": round(seeded.random(), 3),
+                "population": seeded.randint(1, 500),
+            },
+            "artwork_type_id": seeded.randint(1, 20),
+            "department_id": f"PC-{seeded.randint(1, 15)}",
+            "classification_id": f"TM-{seeded.randint(1, 60)}",
+            "style_id": f"TM-{seeded.randint(1000, 1100)}" if seeded.random() > 0.5 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def load_recording(path):
+    """Load a recorded collection written by the record command"""
+    with open(path, "r", encoding="utf-8") as f:
+        recording = json.load(f)
+    return recording.get("data", []), recording.get("total")
+
+
+def record_collection(out_path, pages, limit):
+    """Record artworks from the live API into a replayable collection"""
+    artworks = []
+    total = None
+
+    for page in range(1, pages + 1):
+        query = urllib.parse.urlencode(
+            {"page": page, "limit": limit, "fields": RECORD_FIELDS}
+        )
+        request = urllib.request.Request(f"{LIVE_API_URL}?{query}")
+        request.add_header("User-Agent", "CloudGallery/1.0")
+
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = json.loads(response.read().decode("utf-8"))
+
+        total = data.get("pagination", {}).get("total", total)
+        page_data = data.get("data", [])
+        artworks.extend(page_data)
+        logger.info(f"Recorded page {page}: {len(page_data)} artworks")
+
+        if not page_data:
+            break
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"total": total, "data": artworks}, f)
+
+    logger.info(f"Wrote {len(artworks)} artworks to {out_path}")
+
+
+class FaultConfig:
+    """Latency and fault injection settings shared by all request threads"""
+
+    def __init__(self, latency, rate_429=0.0, rate_5xx=0.0, rate_reset=0.0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_reset = rate_reset
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "429": 0, "5xx": 0, "reset": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def pick_fault(self):
+        """Pick at most one fault for a request"""
+        roll = rng.random()
+        if roll < self.rate_reset:
+            return "reset"
+        roll -= self.rate_reset
+        if roll < self.rate_429:
+            return "429"
+        roll -= self.rate_429
+        if roll < self.rate_5xx:
+            return "5xx"
+        return None
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for concurrent load"""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler serving the artworks endpoint and IIIF images"""
+
+    server_version = "AICStandIn/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        faults = self.server.faults
+        faults.count("requests")
+
+        time.sleep(faults.latency())
+
+        fault = faults.pick_fault()
+        if fault:
+            faults.count(fault)
+        if fault == "reset":
+            self.reset_connection()
+            return
+        if fault == "429":
+            self.send_json(
+                429,
+                {"status": 429, "error": "Too Many Requests"},
+                headers={"Retry-After": "1"},
+            )
+            return
+        if fault == "5xx":
+            status = rng.choice([500, 502, 503])
+            self.send_json(status, {"status": status, "error": "Injected failure"})
+            return
+
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path.rstrip("/")
+
+        if path == "/api/v1/artworks":
+            self.serve_artworks(urllib.parse.parse_qs(parsed.query))
+        elif path.startswith("/iiif/2/"):
+            self.serve_image(path)
+        else:
+            self.send_json(404, {"status": 404, "error": "Not found"})
+
+    def serve_artworks(self, query):
+        artworks = self.server.artworks
+        total = self.server.total
+
+        try:
+            limit = int(query.get("limit", ["12"])[0])
+            if "offset" in query:
+                offset = int(query["offset"][0])
+            else:
+                offset = (int(query.get("page", ["1"])[0]) - 1) * limit
+        except ValueError:
+            self.send_json(400, {"status": 400, "error": "Invalid pagination"})
+            return
+
+        if limit > MAX_LIMIT or offset + limit > MAX_RESULT_WINDOW:
+            self.send_json(
+                403,
+                {"status": 403, "error": "Invalid number of results"},
+            )
+            return
+
+        # Recordings are usually a slice of the collection, so wrap offsets
+        if artworks:
+            page = [artworks[(offset + i) % len(artworks)] for i in range(limit)]
+            page = page[: max(0, min(limit, total - offset))]
+        else:
+            page = []
+
+        fields = query.get("fields", [None])[0]
+        if fields:
+            wanted = fields.split(",")
+            page = [{k: artwork.get(k) for k in wanted} for artwork in page]
+
+        total_pages = (total + limit - 1) // limit if limit else 0
+        host = self.headers.get("Host", "localhost")
+        self.send_json(
+            200,
+            {
+                "pagination": {
+                    "total": total,
+                    "limit": limit,
+                    "offset": offset,
+                    "total_pages": total_pages,
+                    "current_page": offset // limit + 1 if limit else 1,
+                },
+                "data": page,
+                "config": {
+                    "iiif_url": f"http://{host}/iiif/2",
+                    "website_url": "http://www.artic.edu",
+                },
+            },
+        )
+
+    def serve_image(self, path):
+        # /iiif/2/{image_id}/full/{size}/0/default.jpg
+        image_id = path.split("/")[3]
+        image_dir = self.server.image_dir
+        image_path = (
+            os.path.join(image_dir, f"{os.path.basename(image_id)}.jpg")
+            if image_dir
+            else None
+        )
+
+        if image_path and os.path.exists(image_path):
+            with open(image_path, "rb") as f:
+                body = f.read()
+            content_type = "image/jpeg"
+        else:
+            body = PLACEHOLDER_IMAGE
+            content_type = "image/gif"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reset_connection(self):
+        """Abort the connection with a TCP RST instead of a response"""
+        self.connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+        )
+        self.close_connection = True
+        self.connection.close()
+
+
+def create_server(host, port, artworks, total=None, faults=None, image_dir=None):
+    """Create a threaded stand-in server; port 0 picks a free port"""
+    server = StandInServer((host, port), StandInHandler)
+    server.artworks = artworks
+    server.total = min(total or DEFAULT_TOTAL, MAX_RESULT_WINDOW)
+    server.faults = faults or FaultConfig(parse_latency("none"))
+    server.image_dir = image_dir
+    return server
+
+
+def start_in_background(server):
+    """Serve on a daemon thread and return the API base URL"""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/api/v1"
+
+
+def add_fault_arguments(parser):
+    parser.add_argument(
+        "--latency",
+        default="none",
+        help="Latency spec: none, fixed:MS, uniform:LOW,HIGH, "
+        "exponential:MEAN, lognormal:MU,SIGMA",
+    )
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-reset", type=float, default=0.0)
+
+
+def add_collection_arguments(parser):
+    parser.add_argument("--recording", help="Recorded collection JSON file")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=1000,
+        help="Synthetic artworks to serve when no recording is given",
+    )
+    parser.add_argument(
+        "--total",
+        type=int,
+        help=f"Total to report in pagination (default {DEFAULT_TOTAL})",
+    )
+    parser.add_argument("--image-dir", help="Directory of recorded {image_id}.jpg files")
+
+
+def build_server_from_args(args, host, port):
+    if args.recording:
+        artworks, recorded_total = load_recording(args.recording)
+    else:
+        artworks, recorded_total = synthesize_artworks(args.synthetic), None
+
+    faults = FaultConfig(
+        parse_latency(args.latency),
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_reset=args.rate_reset,
+    )
+    return create_server(
+        host,
+        port,
+        artworks,
+        total=args.total or recorded_total,
+        faults=faults,
+        image_dir=args.image_dir,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Record artworks from the live API")
+    record.add_argument("--out", required=True)
+    record.add_argument("--pages", type=int, default=10)
+    record.add_argument("--limit", type=int, default=MAX_LIMIT)
+
+    serve = subparsers.add_parser("serve", help="Serve a recorded collection")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    add_collection_arguments(serve)
+    add_fault_arguments(serve)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.command == "record":
+        record_collection(args.out, args.pages, args.limit)
+        return
+
+    server = build_server_from_args(args, args.host, args.port)
+    logger.info(
+        f"Serving {len(server.artworks)} artworks on "
+        f"http://{args.host}:{server.server_address[1]}/api/v1"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Request stats: {server.faults.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Load-test the fetch_art handler against the local AIC stand-in server.
+
+Starts an in-process stand-in (or targets --base-url), runs many concurrent
+lambda_handler invocations and reports latency percentiles and how
+upstream faults surfaced in the handler responses.
+
+    python tools/load_test.py --invocations 500 --concurrency 50 \\
+        --latency lognormal:4,0.5 --rate-429 0.05 --rate-reset 0.01
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FETCH_ART_DIR = os.path.join(REPO_ROOT, "src", "lambda_functions", "fetch_art")
+FETCH_ART_PATH = os.path.join(FETCH_ART_DIR, "lambda_function.py")
+
+# Mirror the Lambda runtime, where the shared layer and the function's own
+# directory are on the import path
+sys.path.insert(0, os.path.join(REPO_ROOT, "src", "layers", "shared", "python"))
+sys.path.insert(0, FETCH_ART_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The Lambda runtime always sets a region; module-level clients need one
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import aic_standin  # noqa: E402
+
+
+def load_fetch_art():
+    """Import the fetch_art handler module from its source path"""
+    spec = importlib.util.spec_from_file_location("fetch_art_lambda", FETCH_ART_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def invoke(handler):
+    """Run one invocation; returns (seconds, outcome, error, artwork count)"""
+    started = time.perf_counter()
+    count = 0
+    try:
+        response = handler({}, None)
+        body = response.get("body", {})
+        outcome = response.get("statusCode")
+        error = body.get("error")
+        count = body.get("count", 0)
+        # A 200 without artworks publishes an empty gallery
+        if outcome == 200 and not count:
+            outcome = "200 (empty)"
+    except Exception as e:
+        outcome = "raised"
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - started, outcome, error, count
+
+
+def summarize_error(error):
+    """Collapse per-request details so similar failures group together"""
+    if not error:
+        return None
+    return error.split(":")[0][:80]
+
+
+def run_load_test(handler, invocations, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(lambda _: invoke(handler), range(invocations)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    return {
+        "invocations": invocations,
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput": invocations / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            name: percentile(latencies, pct) * 1000
+            for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "outcomes": Counter(r[1] for r in results),
+        "degraded": sum(1 for r in results if r[1] == "200 (empty)"),
+        "artwork_counts": Counter(r[3] for r in results if r[1] == 200),
+        "errors": Counter(summarize_error(r[2]) for r in results if r[2]),
+    }
+
+
+def print_report(report, upstream_stats=None):
+    print(
+        f"Invocations: {report['invocations']} "
+        f"(concurrency {report['concurrency']}) in {report['elapsed']:.2f}s "
+        f"= {report['throughput']:.1f}/s"
+    )
+    print(
+        "Latency ms: "
+        + "  ".join(f"{k}={v:.1f}" for k, v in report["latency_ms"].items())
+    )
+    print("Handler outcomes: " + ", ".join(
+        f"{k}={v}" for k, v in sorted(report["outcomes"].items(), key=str)
+    ))
+    if report["artwork_counts"]:
+        print("Artworks per 200: " + ", ".join(
+            f"{k}x{v}" for k, v in sorted(report["artwork_counts"].items())
+        ))
+    if report["degraded"]:
+        print(f"Degraded: {report['degraded']} returned 200 with no artworks")
+    for error, count in report["errors"].most_common():
+        print(f"  {count:>5}  {error}")
+    if upstream_stats:
+        print("Upstream: " + ", ".join(f"{k}={v}" for k, v in upstream_stats.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--base-url",
+        help="Existing stand-in API base URL; starts one in-process when omitted",
+    )
+    aic_standin.add_collection_arguments(parser)
+    aic_standin.add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server = aic_standin.build_server_from_args(args, "127.0.0.1", 0)
+        base_url = aic_standin.start_in_background(server)
+
+    os.environ["AIC_API_BASE_URL"] = base_url
+    fetch_art = load_fetch_art()
+    fetch_art.logger.setLevel(logging.CRITICAL)
+
+    try:
+        report = run_load_test(fetch_art.lambda_handler, args.invocations, args.concurrency)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    print_report(report, server.faults.stats if server else None)
+
+
+if __name__ == "__main__":
+    main()